@@ -70,11 +70,24 @@ class cPDF:
         self.filename = filename
         self.indirectObjects = {}
         self.objstms = []
+        # File handle kept open from header() until close()
+        self.fPDF = None
+
+    def close(self):
+        """
+        Method to close the PDF file opened by header().
+        """
+        if self.fPDF is not None:
+            self.fPDF.close()
+            self.fPDF = None
 
     def appendString(self, str):
         """
         Internal helper function
         """
+        if self.fPDF is not None:
+            self.fPDF.write(str)
+            return
         fPDF = open(self.filename, 'a')
         fPDF.write(str)
         fPDF.close()
@@ -94,6 +107,13 @@ class cPDF:
         """
         Internal helper function
         """
+        if self.fPDF is not None:
+            if isinstance(data, str):
+                data = data.encode('ascii')
+            # Flush pending text so the bytes land after it
+            self.fPDF.flush()
+            self.fPDF.buffer.write(data)
+            return
         fPDF = open(self.filename, 'ab')
         if sys.version_info[0] == 2:
             fPDF.write(data)
@@ -108,6 +128,9 @@ class cPDF:
         """
         Internal helper function
         """
+        if self.fPDF is not None:
+            # Flushes, then reports the byte offset
+            return self.fPDF.tell()
         fPDF = open(self.filename, 'rb')
         fPDF.seek(0, 2)
         size = fPDF.tell()
@@ -127,10 +150,12 @@ class cPDF:
 
         By default, the version is 1.1, but can be specified with
         the version argument.
+
+        The file stays open for the following writes until close().
         """
-        fPDF = open(self.filename, 'w')
-        fPDF.write('%%PDF-%s\n' % version)
-        fPDF.close()
+        self.close()
+        self.fPDF = open(self.filename, 'w')
+        self.fPDF.write('%%PDF-%s\n' % version)
 
     def binary(self):
         """
@@ -437,6 +462,7 @@ class cPDF:
         Use this method to start an incremental update.
         """
         original = ReadBinaryFile(pdffilename)
+        self.close()
         fPDF = open(self.filename, 'wb')
         if sys.version_info[0] == 2:
             fPDF.write(original)
@@ -763,79 +789,84 @@ class cObjectStream:
 
 def make_pdf_basic(javascript, output_file):
     oPDF = cPDF(output_file)
-    oPDF.header()
-
-    oPDF.indirectobject(
-        1, 0, '<<\n /Type /Catalog\n /Outlines 2 0 R\n /Pages 3 0 R\n /OpenAction 7 0 R\n>>')
-    oPDF.indirectobject(2, 0, '<<\n /Type /Outlines\n /Count 0\n>>')
-    oPDF.indirectobject(
-        3, 0, '<<\n /Type /Pages\n /Kids [4 0 R]\n /Count 1\n>>')
-    oPDF.indirectobject(
-        4, 0, '<<\n /Type /Page\n /Parent 3 0 R\n /MediaBox [0 0 612 792]\n /Contents 5 0 R\n /Resources <<\n             /ProcSet [/PDF /Text]\n             /Font << /F1 6 0 R >>\n            >>\n>>')
-    oPDF.stream(5, 0, 'BT /F1 12 Tf 100 700 Td 15 TL (JavaScript example) Tj ET')
-    oPDF.indirectobject(
-        6, 0, '<<\n /Type /Font\n /Subtype /Type1\n /Name /F1\n /BaseFont /Helvetica\n /Encoding /MacRomanEncoding\n>>')
-
-    oPDF.indirectobject(
-        7, 0, '<<\n /Type /Action\n /S /JavaScript\n /JS (%s)\n>>' % javascript)
-
-    oPDF.xrefAndTrailer('1 0 R')
+    try:
+        oPDF.header()
+
+        oPDF.indirectobject(
+            1, 0, '<<\n /Type /Catalog\n /Outlines 2 0 R\n /Pages 3 0 R\n /OpenAction 7 0 R\n>>')
+        oPDF.indirectobject(2, 0, '<<\n /Type /Outlines\n /Count 0\n>>')
+        oPDF.indirectobject(
+            3, 0, '<<\n /Type /Pages\n /Kids [4 0 R]\n /Count 1\n>>')
+        oPDF.indirectobject(
+            4, 0, '<<\n /Type /Page\n /Parent 3 0 R\n /MediaBox [0 0 612 792]\n /Contents 5 0 R\n /Resources <<\n             /ProcSet [/PDF /Text]\n             /Font << /F1 6 0 R >>\n            >>\n>>')
+        oPDF.stream(5, 0, 'BT /F1 12 Tf 100 700 Td 15 TL (JavaScript example) Tj ET')
+        oPDF.indirectobject(
+            6, 0, '<<\n /Type /Font\n /Subtype /Type1\n /Name /F1\n /BaseFont /Helvetica\n /Encoding /MacRomanEncoding\n>>')
+
+        oPDF.indirectobject(
+            7, 0, '<<\n /Type /Action\n /S /JavaScript\n /JS (%s)\n>>' % javascript)
+
+        oPDF.xrefAndTrailer('1 0 R')
+    finally:
+        # Release the handle header() opened, even if a write fails
+        oPDF.close()
 
 
 def make_pdf(javascript, output_file):
     oPDF = cPDF(output_file)
-    oPDF.header()
+    try:
+        oPDF.header()
 
-    acroform_fields = []
+        acroform_fields = []
 
-    annot_subtypes = [
-        "Caret", "Circle", "FileAttachment", "FreeText", "Highlight", "Ink",
-        "Line", "Polygon", "PolyLine", "Redact", "Sound", "Square",
-        "Squiggly", "Stamp", "StrikeOut", "Text", "Underline"
-    ]
+        annot_subtypes = [
+            "Caret", "Circle", "FileAttachment", "FreeText", "Highlight", "Ink",
+            "Line", "Polygon", "PolyLine", "Redact", "Sound", "Square",
+            "Squiggly", "Stamp", "StrikeOut", "Text", "Underline"
+        ]
 
-    # Create Outlines (obj 2)
-    oPDF.indirectobject(2, 0, '<< /Type /Outlines /Count 0 >>')
+        # Create Outlines (obj 2)
+        oPDF.indirectobject(2, 0, '<< /Type /Outlines /Count 0 >>')
 
-    # Create Font (obj 6)
-    oPDF.indirectobject(6, 0, '<< /Type /Font /Subtype /Type1 /Name /F1 /BaseFont /Helvetica /Encoding /MacRomanEncoding >>')
+        # Create Font (obj 6)
+        oPDF.indirectobject(6, 0, '<< /Type /Font /Subtype /Type1 /Name /F1 /BaseFont /Helvetica /Encoding /MacRomanEncoding >>')
 
-    # Create JavaScript Action (obj 7)
-    oPDF.indirectobject(7, 0, f'<<\n /Type /Action\n /S /JavaScript\n /JS ({javascript})\n>>')
+        # Create JavaScript Action (obj 7)
+        oPDF.indirectobject(7, 0, f'<<\n /Type /Action\n /S /JavaScript\n /JS ({javascript})\n>>')
 
-    acroform_obj_num = 4
+        acroform_obj_num = 4
 
-    current_obj_num = 8 
-    kids = []
+        current_obj_num = 8 
+        kids = []
 
-    for page_num in range(1, 11):
-        page_obj_num = current_obj_num
-        current_obj_num += 1
+        for page_num in range(1, 11):
+            page_obj_num = current_obj_num
+            current_obj_num += 1
         
-        contents_obj_num = current_obj_num
-        current_obj_num += 1
+            contents_obj_num = current_obj_num
+            current_obj_num += 1
         
-        field_obj_num = current_obj_num
-        current_obj_num += 1
+            field_obj_num = current_obj_num
+            current_obj_num += 1
         
-        annot_obj_num = current_obj_num
-        current_obj_num += 1
-
-        # Randomly choose an additional element: link, sound, icon
-        import random
-        choice = random.choice(['link', 'sound', 'icon', 'none'])
-        annots = [field_obj_num, annot_obj_num]
-        resources = {
-            'ProcSet': ['/PDF', '/Text'],
-            'Font': {'/F1': '6 0 R'},
-            'XObject': {}
-        }
-        content_stream_extra = ""
-
-        if choice == 'link':
-            link_annot_num = current_obj_num
+            annot_obj_num = current_obj_num
             current_obj_num += 1
-            link_dict = f"""
+
+            # Randomly choose an additional element: link, sound, icon
+            import random
+            choice = random.choice(['link', 'sound', 'icon', 'none'])
+            annots = [field_obj_num, annot_obj_num]
+            resources = {
+                'ProcSet': ['/PDF', '/Text'],
+                'Font': {'/F1': '6 0 R'},
+                'XObject': {}
+            }
+            content_stream_extra = ""
+
+            if choice == 'link':
+                link_annot_num = current_obj_num
+                current_obj_num += 1
+                link_dict = f"""
 <<
 /Type /Annot
 /Subtype /Link
@@ -843,17 +874,17 @@ def make_pdf(javascript, output_file):
 /A << /Type /Action /S /URI /URI (https://example.com/page{page_num}) >>
 >>
             """
-            oPDF.indirectobject(link_annot_num, 0, link_dict)
-            annots.append(link_annot_num)
-        elif choice == 'sound':
-            sound_annot_num = current_obj_num
-            current_obj_num += 1
-            sound_obj_num = current_obj_num
-            current_obj_num += 1
-            # Example sound data (dummy WAV format)
-            sound_data = b'RIFF\x00\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
-            oPDF.stream(sound_obj_num, 0, sound_data, dictionary="<< /Type /Sound /R 44100 /B 16 /C 1 /Length %d >>")
-            sound_annot_dict = f"""
+                oPDF.indirectobject(link_annot_num, 0, link_dict)
+                annots.append(link_annot_num)
+            elif choice == 'sound':
+                sound_annot_num = current_obj_num
+                current_obj_num += 1
+                sound_obj_num = current_obj_num
+                current_obj_num += 1
+                # Example sound data (dummy WAV format)
+                sound_data = b'RIFF\x00\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
+                oPDF.stream(sound_obj_num, 0, sound_data, dictionary="<< /Type /Sound /R 44100 /B 16 /C 1 /Length %d >>")
+                sound_annot_dict = f"""
 <<
 /Type /Annot
 /Subtype /Sound
@@ -862,31 +893,31 @@ def make_pdf(javascript, output_file):
 /Name /Speaker
 >>
             """
-            oPDF.indirectobject(sound_annot_num, 0, sound_annot_dict)
-            annots.append(sound_annot_num)
-        elif choice == 'icon':
-            image_obj_num = current_obj_num
-            current_obj_num += 1
-            # Example image data (10x10 red square)
-            image_data = b'\xFF\x00\x00' * 100  # RGB values for red
-            oPDF.stream(
-                image_obj_num, 
-                0, 
-                image_data, 
-                dictionary="<< /Type /XObject /Subtype /Image /Width 10 /Height 10 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Length %d >>"
-            )
-            resources['XObject']['/Im1'] = f'{image_obj_num} 0 R'
-            content_stream_extra = "\nq 10 0 0 10 400 500 cm /Im1 Do Q"
-
-        # Build resources string
-        resources_str = "/ProcSet [/PDF /Text] /Font << /F1 6 0 R >>"
-        if resources['XObject']:
-            xobjects = ' '.join([f"{name} {ref}" for name, ref in resources['XObject'].items()])
-            resources_str += f" /XObject << {xobjects} >>"
-
-        acroform_fields.append(f"{field_obj_num} 0 R")
-        # annots = [field_obj_num, annot_obj_num]
-        page_dict = f"""
+                oPDF.indirectobject(sound_annot_num, 0, sound_annot_dict)
+                annots.append(sound_annot_num)
+            elif choice == 'icon':
+                image_obj_num = current_obj_num
+                current_obj_num += 1
+                # Example image data (10x10 red square)
+                image_data = b'\xFF\x00\x00' * 100  # RGB values for red
+                oPDF.stream(
+                    image_obj_num, 
+                    0, 
+                    image_data, 
+                    dictionary="<< /Type /XObject /Subtype /Image /Width 10 /Height 10 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Length %d >>"
+                )
+                resources['XObject']['/Im1'] = f'{image_obj_num} 0 R'
+                content_stream_extra = "\nq 10 0 0 10 400 500 cm /Im1 Do Q"
+
+            # Build resources string
+            resources_str = "/ProcSet [/PDF /Text] /Font << /F1 6 0 R >>"
+            if resources['XObject']:
+                xobjects = ' '.join([f"{name} {ref}" for name, ref in resources['XObject'].items()])
+                resources_str += f" /XObject << {xobjects} >>"
+
+            acroform_fields.append(f"{field_obj_num} 0 R")
+            # annots = [field_obj_num, annot_obj_num]
+            page_dict = f"""
 <<
 /Type /Page
 /Parent 3 0 R
@@ -896,14 +927,14 @@ def make_pdf(javascript, output_file):
 /Annots [ {' '.join([f"{a} 0 R" for a in annots])} ]
 >>
         """
-        oPDF.indirectobject(page_obj_num, 0, page_dict)
-        kids.append(f"{page_obj_num} 0 R")
+            oPDF.indirectobject(page_obj_num, 0, page_dict)
+            kids.append(f"{page_obj_num} 0 R")
 
-        # Create Contents stream
-        content_stream = f"BT /F1 12 Tf 100 {700 - (page_num-1)*50} Td 15 TL (Page {page_num}) Tj ET{content_stream_extra}"
-        oPDF.stream(contents_obj_num, 0, content_stream)
+            # Create Contents stream
+            content_stream = f"BT /F1 12 Tf 100 {700 - (page_num-1)*50} Td 15 TL (Page {page_num}) Tj ET{content_stream_extra}"
+            oPDF.stream(contents_obj_num, 0, content_stream)
 
-        field_dict = f"""
+            field_dict = f"""
 <<
 /Type /Annot
 /Subtype /Widget
@@ -915,10 +946,10 @@ def make_pdf(javascript, output_file):
 /Border [0 0 1]
 >>
         """
-        oPDF.indirectobject(field_obj_num, 0, field_dict)
+            oPDF.indirectobject(field_obj_num, 0, field_dict)
 
-        annot_subtype = random.choice(annot_subtypes)
-        annot_dict = f"""
+            annot_subtype = random.choice(annot_subtypes)
+            annot_dict = f"""
 <<
 /Type /Annot
 /Subtype /{annot_subtype}
@@ -928,73 +959,77 @@ def make_pdf(javascript, output_file):
 /P {page_obj_num} 0 R
 >>
         """
-        oPDF.indirectobject(annot_obj_num, 0, annot_dict)
+            oPDF.indirectobject(annot_obj_num, 0, annot_dict)
 
-    oPDF.indirectobject(
-        acroform_obj_num, 
-        0, 
-        f"<< /Fields [ {' '.join(acroform_fields)} ] /DR << /Font << /F1 6 0 R >> >> /NeedAppearances true >>"
-    )
+        oPDF.indirectobject(
+            acroform_obj_num, 
+            0, 
+            f"<< /Fields [ {' '.join(acroform_fields)} ] /DR << /Font << /F1 6 0 R >> >> /NeedAppearances true >>"
+        )
 
-    oPDF.indirectobject(3, 0, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>")
+        oPDF.indirectobject(3, 0, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>")
 
-    oPDF.indirectobject(
-        1, 
-        0, 
-        "<< /Type /Catalog /Outlines 2 0 R /Pages 3 0 R /OpenAction 7 0 R /AcroForm 4 0 R >>"
-    )
+        oPDF.indirectobject(
+            1, 
+            0, 
+            "<< /Type /Catalog /Outlines 2 0 R /Pages 3 0 R /OpenAction 7 0 R /AcroForm 4 0 R >>"
+        )
 
-    oPDF.xrefAndTrailer('1 0 R')
+        oPDF.xrefAndTrailer('1 0 R')
+    finally:
+        # Release the handle header() opened, even if a write fails
+        oPDF.close()
 
 
 def make_pdf_bug(javascript, output_file):
     oPDF = cPDF(output_file)
-    oPDF.header()
-
-    # Create Outlines object (obj 2)
-    oPDF.indirectobject(2, 0, '<< /Type /Outlines /Count 0 >>')
-
-    # Create Font object (obj 6)
-    oPDF.indirectobject(6, 0, '<< /Type /Font /Subtype /Type1 /Name /F1 /BaseFont /Helvetica /Encoding /MacRomanEncoding >>')
-
-    # Create JavaScript Action object (obj 7)
-    oPDF.indirectobject(7, 0, '<<\n /Type /Action\n /S /JavaScript\n /JS (%s)\n>>' % javascript)
-
-    current_obj_num = 8  # Starting object number for pages and their components
-    kids = []  # To collect page references for the parent Pages object
-
-    for page_num in range(1, 11):
-        # Page object number
-        page_obj_num = current_obj_num
-        current_obj_num += 1
-
-        # Contents stream object number
-        contents_obj_num = current_obj_num
-        current_obj_num += 1
-
-        # Field (Widget Annot) object number
-        field_obj_num = current_obj_num
-        current_obj_num += 1
-
-        # Text Annot object number
-        annot_obj_num = current_obj_num
-        current_obj_num += 1
-
-        # Randomly choose an additional element: link, sound, icon
-        import random
-        choice = random.choice(['link', 'sound', 'icon', 'none'])
-        annots = [field_obj_num, annot_obj_num]
-        resources = {
-            'ProcSet': ['/PDF', '/Text'],
-            'Font': {'/F1': '6 0 R'},
-            'XObject': {}
-        }
-        content_stream_extra = ""
-
-        if choice == 'link':
-            link_annot_num = current_obj_num
+    try:
+        oPDF.header()
+
+        # Create Outlines object (obj 2)
+        oPDF.indirectobject(2, 0, '<< /Type /Outlines /Count 0 >>')
+
+        # Create Font object (obj 6)
+        oPDF.indirectobject(6, 0, '<< /Type /Font /Subtype /Type1 /Name /F1 /BaseFont /Helvetica /Encoding /MacRomanEncoding >>')
+
+        # Create JavaScript Action object (obj 7)
+        oPDF.indirectobject(7, 0, '<<\n /Type /Action\n /S /JavaScript\n /JS (%s)\n>>' % javascript)
+
+        current_obj_num = 8  # Starting object number for pages and their components
+        kids = []  # To collect page references for the parent Pages object
+
+        for page_num in range(1, 11):
+            # Page object number
+            page_obj_num = current_obj_num
+            current_obj_num += 1
+
+            # Contents stream object number
+            contents_obj_num = current_obj_num
             current_obj_num += 1
-            link_dict = f"""
+
+            # Field (Widget Annot) object number
+            field_obj_num = current_obj_num
+            current_obj_num += 1
+
+            # Text Annot object number
+            annot_obj_num = current_obj_num
+            current_obj_num += 1
+
+            # Randomly choose an additional element: link, sound, icon
+            import random
+            choice = random.choice(['link', 'sound', 'icon', 'none'])
+            annots = [field_obj_num, annot_obj_num]
+            resources = {
+                'ProcSet': ['/PDF', '/Text'],
+                'Font': {'/F1': '6 0 R'},
+                'XObject': {}
+            }
+            content_stream_extra = ""
+
+            if choice == 'link':
+                link_annot_num = current_obj_num
+                current_obj_num += 1
+                link_dict = f"""
 <<
 /Type /Annot
 /Subtype /Link
@@ -1002,17 +1037,17 @@ def make_pdf_bug(javascript, output_file):
 /A << /Type /Action /S /URI /URI (https://example.com/page{page_num}) >>
 >>
             """
-            oPDF.indirectobject(link_annot_num, 0, link_dict)
-            annots.append(link_annot_num)
-        elif choice == 'sound':
-            sound_annot_num = current_obj_num
-            current_obj_num += 1
-            sound_obj_num = current_obj_num
-            current_obj_num += 1
-            # Example sound data (dummy WAV format)
-            sound_data = b'RIFF\x00\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
-            oPDF.stream(sound_obj_num, 0, sound_data, dictionary="<< /Type /Sound /R 44100 /B 16 /C 1 /Length %d >>")
-            sound_annot_dict = f"""
+                oPDF.indirectobject(link_annot_num, 0, link_dict)
+                annots.append(link_annot_num)
+            elif choice == 'sound':
+                sound_annot_num = current_obj_num
+                current_obj_num += 1
+                sound_obj_num = current_obj_num
+                current_obj_num += 1
+                # Example sound data (dummy WAV format)
+                sound_data = b'RIFF\x00\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
+                oPDF.stream(sound_obj_num, 0, sound_data, dictionary="<< /Type /Sound /R 44100 /B 16 /C 1 /Length %d >>")
+                sound_annot_dict = f"""
 <<
 /Type /Annot
 /Subtype /Sound
@@ -1021,30 +1056,30 @@ def make_pdf_bug(javascript, output_file):
 /Name /Speaker
 >>
             """
-            oPDF.indirectobject(sound_annot_num, 0, sound_annot_dict)
-            annots.append(sound_annot_num)
-        elif choice == 'icon':
-            image_obj_num = current_obj_num
-            current_obj_num += 1
-            # Example image data (10x10 red square)
-            image_data = b'\xFF\x00\x00' * 100  # RGB values for red
-            oPDF.stream(
-                image_obj_num, 
-                0, 
-                image_data, 
-                dictionary="<< /Type /XObject /Subtype /Image /Width 10 /Height 10 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Length %d >>"
-            )
-            resources['XObject']['/Im1'] = f'{image_obj_num} 0 R'
-            content_stream_extra = "\nq 10 0 0 10 400 500 cm /Im1 Do Q"
-
-        # Build resources string
-        resources_str = "/ProcSet [/PDF /Text] /Font << /F1 6 0 R >>"
-        if resources['XObject']:
-            xobjects = ' '.join([f"{name} {ref}" for name, ref in resources['XObject'].items()])
-            resources_str += f" /XObject << {xobjects} >>"
-
-        # Create Page object
-        page_dict = f"""
+                oPDF.indirectobject(sound_annot_num, 0, sound_annot_dict)
+                annots.append(sound_annot_num)
+            elif choice == 'icon':
+                image_obj_num = current_obj_num
+                current_obj_num += 1
+                # Example image data (10x10 red square)
+                image_data = b'\xFF\x00\x00' * 100  # RGB values for red
+                oPDF.stream(
+                    image_obj_num, 
+                    0, 
+                    image_data, 
+                    dictionary="<< /Type /XObject /Subtype /Image /Width 10 /Height 10 /ColorSpace /DeviceRGB /BitsPerComponent 8 /Length %d >>"
+                )
+                resources['XObject']['/Im1'] = f'{image_obj_num} 0 R'
+                content_stream_extra = "\nq 10 0 0 10 400 500 cm /Im1 Do Q"
+
+            # Build resources string
+            resources_str = "/ProcSet [/PDF /Text] /Font << /F1 6 0 R >>"
+            if resources['XObject']:
+                xobjects = ' '.join([f"{name} {ref}" for name, ref in resources['XObject'].items()])
+                resources_str += f" /XObject << {xobjects} >>"
+
+            # Create Page object
+            page_dict = f"""
 <<
 /Type /Page
 /Parent 3 0 R
@@ -1055,15 +1090,15 @@ def make_pdf_bug(javascript, output_file):
 /Annots [ {' '.join([f"{a} 0 R" for a in annots])} ]
 >>
         """
-        oPDF.indirectobject(page_obj_num, 0, page_dict)
-        kids.append(f"{page_obj_num} 0 R")
+            oPDF.indirectobject(page_obj_num, 0, page_dict)
+            kids.append(f"{page_obj_num} 0 R")
 
-        # Create Contents stream
-        content_stream = f"BT /F1 12 Tf 100 {700 - (page_num-1)*50} Td 15 TL (Page {page_num}) Tj ET{content_stream_extra}"
-        oPDF.stream(contents_obj_num, 0, content_stream)
+            # Create Contents stream
+            content_stream = f"BT /F1 12 Tf 100 {700 - (page_num-1)*50} Td 15 TL (Page {page_num}) Tj ET{content_stream_extra}"
+            oPDF.stream(contents_obj_num, 0, content_stream)
 
-        # Create Field annotation
-        field_dict = f"""
+            # Create Field annotation
+            field_dict = f"""
 <<
 /Type /Annot
 /Subtype /Widget
@@ -1073,10 +1108,10 @@ def make_pdf_bug(javascript, output_file):
 /V (Sample Text {page_num})
 >>
         """
-        oPDF.indirectobject(field_obj_num, 0, field_dict)
+            oPDF.indirectobject(field_obj_num, 0, field_dict)
 
-        # Create Text annotation
-        annot_dict = f"""
+            # Create Text annotation
+            annot_dict = f"""
 <<
 /Type /Annot
 /Subtype /Text
@@ -1085,16 +1120,19 @@ def make_pdf_bug(javascript, output_file):
 /T (my_annot{page_num})
 >>
         """
-        oPDF.indirectobject(annot_obj_num, 0, annot_dict)
+            oPDF.indirectobject(annot_obj_num, 0, annot_dict)
 
-    # Create parent Pages object (obj 3)
-    oPDF.indirectobject(3, 0, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>")
+        # Create parent Pages object (obj 3)
+        oPDF.indirectobject(3, 0, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>")
 
-    # Create Catalog (Root) object (obj 1)
-    oPDF.indirectobject(1, 0, "<< /Type /Catalog /Outlines 2 0 R /Pages 3 0 R /OpenAction 7 0 R >>")
+        # Create Catalog (Root) object (obj 1)
+        oPDF.indirectobject(1, 0, "<< /Type /Catalog /Outlines 2 0 R /Pages 3 0 R /OpenAction 7 0 R >>")
 
-    # Generate xref and trailer
-    oPDF.xrefAndTrailer('1 0 R')
+        # Generate xref and trailer
+        oPDF.xrefAndTrailer('1 0 R')
+    finally:
+        # Release the handle header() opened, even if a write fails
+        oPDF.close()
 
 
 def make_pdf_from_file(input_file, output_file):
@@ -1,16 +1,35 @@
 import os
 import sys
 import time
+import shutil
 import subprocess
 import psutil
 import pywinauto
 import win32api
+import win32con
+import win32event
 import random
 import win32evtlog
 import argparse
+import atexit
+from collections import defaultdict
 
 # Common Configuration
 TEST_DIR = os.path.join(os.getcwd(), 'test')
+RUNLOG_PATH = 'runlog.txt'
+
+_runlog = None  # Shared line-buffered handle, opened on first writeResult
+
+
+def getRunlog():
+    """Return the shared runlog handle, closed at exit"""
+    global _runlog
+    if _runlog is None:
+        # Line buffering: each result reaches the file even if the fuzzer is killed
+        _runlog = open(RUNLOG_PATH, 'a', buffering=1)
+        atexit.register(_runlog.close)
+    return _runlog
+
 
 class BaseMonitor:
     """Base class for PDF reader monitoring"""
@@ -20,8 +39,20 @@ class BaseMonitor:
     PROCESS_NAME = ''
     APP_NAME_FOR_CRASH = ''
     DERIVED_PROCESSES = []
+    DERIVED_SET = frozenset()  # Lowercased DERIVED_PROCESSES + crash/print helpers, set per subclass
     EVENTLOG_FILTER_KEY = ''
 
+    TICK_INTERVAL = 1.0  # Seconds between status checks
+    MIN_SAMPLE_INTERVAL = 0.9  # Shortest CPU sample window that counts as a tick
+    CPU_IDLE_THRESHOLD = 20
+    IDLE_TICKS_TO_STOP = 4  # ~4s idle, like the old 1s sample + 2s sleep + 1s sample
+
+    def __init_subclass__(cls, **kwargs):
+        """Build DERIVED_SET once from the subclass's DERIVED_PROCESSES"""
+        super().__init_subclass__(**kwargs)
+        cls.DERIVED_SET = frozenset(
+            n.lower() for n in cls.DERIVED_PROCESSES + ['WerFault.exe', 'splwow64.exe'])
+
     def __init__(self, fileName, timeOut=120):
         """Initialize common parameters"""
         self.status = 'init'
@@ -31,18 +62,39 @@ class BaseMonitor:
         self.popup_avl = 0  # Special flag for Adobe AVL popups
         self.crash_key = ''
         self.pid = None
+        self.launch_pid = None   # PID returned by Popen in openPDF
         self.app = None
+        self._hProc = None       # SYNCHRONIZE handle on the target process
+        self._name_cache = None  # lowercase process name -> [pid, ...]
+        self._low_cpu_ticks = 0
+        # Prime the sampler so later interval=None calls never block
+        psutil.cpu_percent(interval=None)
+        self._last_sample = time.monotonic()
 
     def log(self, info):
         """Log messages with timestamp"""
         t = time.strftime("%H:%M:%S", time.localtime())
         print(t + ' ' + info)
 
+    def refreshPidCache(self):
+        """Snapshot running processes once into a name -> PIDs map"""
+        cache = defaultdict(list)
+        for p in psutil.process_iter(attrs=['pid', 'name']):
+            if p.info['name']:
+                cache[p.info['name'].lower()].append(p.info['pid'])
+        self._name_cache = cache
+
     def getPidsByName(self, pname):
-        """Get process IDs by process name"""
-        return [p.info['pid']
-                for p in psutil.process_iter(attrs=['pid', 'name'])
-                if p.info['name'] == pname]
+        """Get process IDs by process name (from the current snapshot)"""
+        if self._name_cache is None:
+            self.refreshPidCache()
+        return list(self._name_cache.get(pname.lower(), []))
+
+    def isRunning(self, pname):
+        """Check whether any process with this name is in the current snapshot"""
+        if self._name_cache is None:
+            self.refreshPidCache()
+        return pname.lower() in self._name_cache
 
     def closeProcess(self, pname):
         """Terminate processes by name"""
@@ -54,6 +106,36 @@ class BaseMonitor:
                     p.kill()
         except Exception as e:
             self.log(str(e))
+        finally:
+            # Killed processes are gone; drop them from the snapshot
+            if self._name_cache is not None:
+                self._name_cache.pop(pname.lower(), None)
+
+    def closeProcesses(self, pnames):
+        """Terminate several processes by name with a single taskkill call"""
+        self.refreshPidCache()
+        live = [n for n in pnames if self.getPidsByName(n)]
+        if not live:
+            return
+
+        args = ['taskkill', '/F']
+        for n in live:
+            args += ['/IM', n]
+        try:
+            ret = subprocess.run(args, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.DEVNULL,
+                                 creationflags=subprocess.CREATE_NO_WINDOW).returncode
+        except OSError as e:
+            self.log(str(e))
+            ret = -1
+
+        # 128: process already gone; anything else falls back to psutil
+        if ret in (0, 128):
+            for n in live:
+                self._name_cache.pop(n.lower(), None)
+        else:
+            for n in live:
+                self.closeProcess(n)
 
     def clearDerived(self):
         """Clean up related processes (to be implemented in child classes)"""
@@ -61,24 +143,53 @@ class BaseMonitor:
 
     def checkStart(self):
         """Check if target process started successfully"""
+        self.refreshPidCache()
         pid_lst = self.getPidsByName(self.PROCESS_NAME)
         if len(pid_lst) > 0:
-            self.pid = pid_lst[0]
+            # Prefer the process we launched; readers may hand off to another instance
+            self.pid = self.launch_pid if self.launch_pid in pid_lst else pid_lst[0]
             self.app = pywinauto.Application().connect(process=self.pid)
+            self.openProcessHandle()
             self.status = 'running'
             self.log(f'checkStart - pid:{self.pid}')
             return True
         return False
 
+    def openProcessHandle(self):
+        """Open a waitable handle on the target so exits are seen immediately"""
+        self.closeProcessHandle()
+        try:
+            self._hProc = win32api.OpenProcess(win32con.SYNCHRONIZE, False, self.pid)
+        except Exception as e:
+            self.log(f'OpenProcess failed, falling back to polling: {e}')
+
+    def closeProcessHandle(self):
+        """Release the target process handle"""
+        if self._hProc is not None:
+            win32api.CloseHandle(self._hProc)
+            self._hProc = None
+
+    def waitProcessExit(self, timeout):
+        """Wait up to timeout seconds; return True as soon as the target exits"""
+        if timeout <= 0:
+            return False
+        if self._hProc is None:
+            time.sleep(timeout)
+            return False
+        ret = win32event.WaitForSingleObject(self._hProc, int(timeout * 1000))
+        return ret == win32event.WAIT_OBJECT_0
+
     def openPDF(self):
         """Open target PDF file"""
         fpath = os.path.join(TEST_DIR, self.fileName) if len(
             TEST_DIR) > 0 else self.fileName
-        cmd = f'{self.APP_PATH} {fpath}'
-        self.log(f'Executing: {cmd}')
-        subprocess.Popen(cmd, shell=True)
-        
+        self.log(f'Executing: {self.APP_PATH} {fpath}')
+        proc = subprocess.Popen([self.APP_PATH, fpath], close_fds=True,
+                                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+        self.launch_pid = proc.pid
+
         for _ in range(10):
+            # Give the reader time to create its windows before connecting
             time.sleep(1)
             if self.checkStart():
                 return True
@@ -94,9 +205,10 @@ class BaseMonitor:
 
     def checkCrash(self):
         """Detect application crash through WerFault"""
-        werfault_list = self.getPidsByName('WerFault.exe')
-        if not werfault_list:
+        # Common case: no WerFault in this tick's snapshot, a single dict lookup
+        if not self.isRunning('WerFault.exe'):
             return False
+        werfault_list = self.getPidsByName('WerFault.exe')
 
         # Verify crash is for our target application
         werfault_app = pywinauto.Application().connect(process=werfault_list[0])
@@ -116,28 +228,53 @@ class BaseMonitor:
         """Handle application popups (to be implemented in child classes)"""
         raise NotImplementedError
 
-    def checkStatus(self, enter=0):
+    def sampleCpu(self):
+        """Non-blocking CPU usage since the previous sample"""
+        return psutil.cpu_percent(interval=None)
+
+    def checkStatus(self):
         """Main status checking logic"""
-        if psutil.cpu_percent(interval=1.0) < 20:
-            if not self.checkHalt():
-                if not self.checkCrash():
-                    if not self.checkPop():
-                        if enter:
-                            self.status = 'stop'
-                            self.log('Check - Stop')
-                        else:
-                            self.log('Check - Low CPU usage')
-                            time.sleep(2)
-                            self.checkStatus(1)
+        # cpu_percent(interval=None) over a near-zero window is noise; let the window grow
+        now = time.monotonic()
+        if now - self._last_sample < self.MIN_SAMPLE_INTERVAL:
+            return
+        self._last_sample = now
+
+        if self.sampleCpu() >= self.CPU_IDLE_THRESHOLD:
+            self._low_cpu_ticks = 0
+            return
+
+        # One process scan per tick, shared by all checks below
+        self.refreshPidCache()
+        if self.checkHalt() or self.checkCrash() or self.checkPop():
+            self._low_cpu_ticks = 0
+            return
+
+        # Idle with nothing to handle: stop once it has lasted IDLE_TICKS_TO_STOP ticks
+        self._low_cpu_ticks += 1
+        if self._low_cpu_ticks >= self.IDLE_TICKS_TO_STOP:
+            self.status = 'stop'
+            self.log('Check - Stop')
+        elif self._low_cpu_ticks == 1:
+            self.log('Check - Low CPU usage')
 
     def checkMain(self):
         """Monitor main loop"""
-        startTime = time.time()
+        startTime = time.monotonic()
+        deadline = startTime + self.timeOut
+        nextTick = startTime
         ret = False
 
-        for _ in range(self.timeOut // 2):
-            time.sleep(1)
-            self.checkStatus()
+        while time.monotonic() < deadline:
+            # After a slow check, restart the schedule from now rather than firing back to back
+            nextTick = max(nextTick, time.monotonic())
+            nextTick += min(self.TICK_INTERVAL, deadline - nextTick)
+            if self.waitProcessExit(nextTick - time.monotonic()):
+                # Target exited: skip the rest of the tick and go straight to halt
+                self.closeProcessHandle()
+                self.checkHalt()
+            else:
+                self.checkStatus()
             if self.status != 'running':
                 ret = True
                 break
@@ -146,12 +283,11 @@ class BaseMonitor:
             self.status = 'hang'
             self.log('Check - Hang')
 
-        self.log(f'End - Running time: {int(time.time() - startTime)}s')
+        self.log(f'End - Running time: {int(time.monotonic() - startTime)}s')
 
     def writeResult(self):
-        with open('runlog.txt', 'a') as f:
-            f.write('%s %s %s\n' %
-                    (self.fileName, self.status, str(self.popup)))
+        getRunlog().write('%s %s %s\n' %
+                          (self.fileName, self.status, str(self.popup)))
         return self.status
 
     def savePDF(self):
@@ -164,8 +300,7 @@ class BaseMonitor:
 
         src = os.path.join(TEST_DIR, self.fileName)
         dst = os.path.join(save_dir, self.fileName)
-        with open(src, 'rb') as f_src, open(dst, 'wb') as f_dst:
-            f_dst.write(f_src.read())
+        shutil.copyfile(src, dst)
         self.log(f'Saved - {self.status} - {self.fileName}')
 
     def closeReader(self):
@@ -189,23 +324,38 @@ class BaseMonitor:
             self.status = 'error'
             self.log(str(e))
         finally:
+            self.closeProcessHandle()
             self.clearDerived()
             self.savePDF()
 
 
 class AdobeMonitor(BaseMonitor):
     """Adobe Acrobat Reader specific implementation"""
-    APP_PATH = r'"C:\Program Files (x86)\Adobe\Acrobat Reader DC\Reader\AcroRd32.exe"'
+    APP_PATH = r'C:\Program Files (x86)\Adobe\Acrobat Reader DC\Reader\AcroRd32.exe'
     PROCESS_NAME = 'AcroRd32.exe'
     APP_NAME_FOR_CRASH = 'Adobe'
     DERIVED_PROCESSES = ['AcroRd32.exe', 'AdobeCollabSync.exe', 
                         'AdobeARM.exe', 'RdrCEF.exe']
     EVENTLOG_FILTER_KEY = 'acrord32'
 
+    def __init__(self, fileName, timeOut=120):
+        super().__init__(fileName, timeOut)
+        self._main_win = None  # Cached AcrobatSDIWindow wrapper
+
     def clearDerived(self):
         """Clean up Adobe-related processes"""
-        for proc in self.DERIVED_PROCESSES + ['WerFault.exe', 'splwow64.exe']:
-            self.closeProcess(proc)
+        self.closeProcesses(self.DERIVED_SET)
+
+    def _findMainWindow(self):
+        """Return the AcrobatSDIWindow, searching only when the cached HWND is gone"""
+        if self._main_win is not None and pywinauto.handleprops.iswindow(self._main_win.handle):
+            return self._main_win
+        self._main_win = None
+        for w in self.app.windows():
+            if w.class_name() == 'AcrobatSDIWindow':
+                self._main_win = w
+                break
+        return self._main_win
 
     def checkPop(self):
         """Handle Adobe-specific popups"""
@@ -213,11 +363,11 @@ class AdobeMonitor(BaseMonitor):
             self.closeProcess("VMwareHostOpen.exe")
 
             # Focus main window
-            for w in self.app.windows():
-                if w.class_name() == 'AcrobatSDIWindow':
-                    w.set_focus()
-                    break
+            main_win = self._findMainWindow()
+            if main_win is not None:
+                main_win.set_focus()
 
+            # top_window() only considers visible windows and waits for one to appear
             win = self.app.top_window()
             cname = win.class_name()
             w_text = win.window_text()
@@ -232,10 +382,10 @@ class AdobeMonitor(BaseMonitor):
                     #     return False
                     self._handle_avl_popup(win)
                 else:
-                    self._handle_generic_popup(win)
+                    self._handle_generic_popup(win, cname)
                 return True  # Popup handled
 
-            if win.window_text().startswith('Adobe Acrobat Reader (32-bit)'):
+            if w_text.startswith('Adobe Acrobat Reader (32-bit)'):
                 self.status = 'finish'
                 self.log('Check - close')
                 try:
@@ -255,6 +405,7 @@ class AdobeMonitor(BaseMonitor):
     def _handle_avl_popup(self, win):
         """Handle AVL_AVPopup specific logic"""
         win.set_focus()
+        # Focusing the popup reorders the windows, so enumerate after it
         all_wins = self.app.windows()
         target_win = all_wins[1] if len(all_wins) > 1 else win
         rect = target_win.rectangle()
@@ -269,10 +420,10 @@ class AdobeMonitor(BaseMonitor):
         pywinauto.mouse.click(coords=(x, y))
         self.popup_avl = 1
 
-    def _handle_generic_popup(self, win):
+    def _handle_generic_popup(self, win, cname):
         """Handle generic popups"""
         win.set_focus()
-        if win.class_name() == '#32768':  # System menu
+        if cname == '#32768':  # System menu
             pywinauto.keyboard.send_keys('%{a}')
         else:
             pywinauto.keyboard.send_keys('%{F4}')
@@ -280,7 +431,7 @@ class AdobeMonitor(BaseMonitor):
 
 class FoxitMonitor(BaseMonitor):
     """Foxit PDF Reader specific implementation"""
-    APP_PATH = r'"C:\Program Files (x86)\Foxit Software\Foxit PDF Reader\FoxitPDFReader.exe"'
+    APP_PATH = r'C:\Program Files (x86)\Foxit Software\Foxit PDF Reader\FoxitPDFReader.exe'
     PROCESS_NAME = 'FoxitPDFReader.exe'
     APP_NAME_FOR_CRASH = 'Foxit'
     DERIVED_PROCESSES = ['FoxitPDFReader.exe', 'OpenWith.exe']
@@ -288,8 +439,7 @@ class FoxitMonitor(BaseMonitor):
 
     def clearDerived(self):
         """Clean up Foxit-related processes"""
-        for proc in self.DERIVED_PROCESSES + ['WerFault.exe', 'splwow64.exe']:
-            self.closeProcess(proc)
+        self.closeProcesses(self.DERIVED_SET)
 
     def checkPop(self):
         """Handle Foxit-specific popups"""
@@ -341,7 +491,7 @@ class FoxitMonitor(BaseMonitor):
 
 class XchangeMonitor(BaseMonitor):
     """Foxit PDF Reader specific implementation"""
-    APP_PATH = r'"C:\Program Files\Tracker Software\PDF Editor\PDFXEdit.exe"'
+    APP_PATH = r'C:\Program Files\Tracker Software\PDF Editor\PDFXEdit.exe'
     PROCESS_NAME = 'PDFXEdit.exe'
     APP_NAME_FOR_CRASH = 'Xchange'
     DERIVED_PROCESSES = ['PDFXEdit.exe', 'OpenWith.exe']
@@ -349,8 +499,7 @@ class XchangeMonitor(BaseMonitor):
 
     def clearDerived(self):
         """Clean up Foxit-related processes"""
-        for proc in self.DERIVED_PROCESSES + ['WerFault.exe', 'splwow64.exe']:
-            self.closeProcess(proc)
+        self.closeProcesses(self.DERIVED_SET)
 
     def checkHalt(self):
         """Override: Treat process halt as crash for Xchange"""
@@ -408,20 +557,30 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='JavaScript Fuzzing Monitor')
     parser.add_argument('-t', '--target', required=True,
                       help='Fuzz target: adobe, foxit, xchange')
-    parser.add_argument('-i', '--input', required=True,
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-i', '--input',
                       help='Fuzz target file name')
+    group.add_argument('-b', '--batch',
+                      help='File listing fuzz target file names, one per line')
     args = parser.parse_args()
     if args.target == "adobe":
-        # Adobe Test
-        adobe_test = AdobeMonitor(args.input)
-        adobe_test.startUp()
+        monitor_cls = AdobeMonitor
     elif args.target == "foxit":
-        # Foxit Test
-        foxit_test = FoxitMonitor(args.input)
-        foxit_test.startUp()
+        monitor_cls = FoxitMonitor
     elif args.target == "xchange":
-        # Xchange Test
-        xchange_test = XchangeMonitor(args.input)
-        xchange_test.startUp()
+        monitor_cls = XchangeMonitor
+    else:
+        print(f"Unknown target name {args.target}...")
+        sys.exit(1)
+
+    if args.batch:
+        # Monitor every listed file in this process, one reader at a time
+        with open(args.batch, 'r') as f:
+            file_names = [line.strip() for line in f if line.strip()]
+        for file_name in file_names:
+            test = monitor_cls(file_name)
+            test.startUp()
+            test.writeResult()
     else:
-        print(f"Unknown target name {args.target}...")
\ No newline at end of file
+        test = monitor_cls(args.input)
+        test.startUp()
@@ -1,66 +1,106 @@
 import os
 import json
 import random
-from typing import Dict
+import functools
+from typing import Any, Dict, List, Optional, Tuple
 from .parameterGenerator import ParameterGenerator
 from .generator_utils import normalize_generated_value, generate_random_string, remove_special_characters, generate_printable_string
 
+_PLACEHOLDER_VALUES = frozenset(("<<BUILTINOBJ>>", "<<SCRIPTS>>"))
+_DIGITS = "0123456789"
+# Return types that never yield a reusable object, so no return variable is emitted
+_METHOD_TRIVIAL_RETURN_TYPES = frozenset(("unknown", "Boolean", "String", "Integer", "Number", "void"))
+_PROPERTY_TRIVIAL_RETURN_TYPES = frozenset(("unknown", "Boolean", "String", "Integer"))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_api_folder(folder_path: str) -> Tuple[Dict[str, Any], Tuple[str, ...], bool]:
+    """
+    Read API_INFO.json and scan an API folder once, returning
+    (api_info, parameter directory names, has_no_parameters).
+    """
+    api_info_path = os.path.join(folder_path, "API_INFO.json")
+    if not os.path.isfile(api_info_path):
+        raise FileNotFoundError(f"API_INFO.json not found in the folder: {folder_path}")
+    with open(api_info_path, "r", encoding="utf-8") as f:
+        api_info = json.load(f)
+
+    # DirEntry.is_dir() reuses the type info from the directory scan
+    with os.scandir(folder_path) as it:
+        entries = list(it)
+    param_dirs = tuple(entry.name for entry in entries if entry.is_dir())
+    # No subfolders plus an empty.json means the API call requires no parameters
+    has_no_parameters = not param_dirs and any(entry.name == "empty.json" for entry in entries)
+    return api_info, param_dirs, has_no_parameters
+
 
 class APIGenerator:
+    # Absolute API folder path -> ParameterGenerators, shared by every instance of that API
+    _folder_cache: Dict[str, Dict[str, ParameterGenerator]] = {}
 
-    def __init__(self, folder_path: str):
-        self.folder_path = folder_path
+    def __init__(self, folder_path: str) -> None:
+        self.folder_path: str = folder_path
         self.param_generators: Dict[str, ParameterGenerator] = {}
-        self._has_no_parameters = False
-
-        # Load API information from API_INFO.json
-        api_info_path = os.path.join(self.folder_path, "API_INFO.json")
-        if not os.path.isfile(api_info_path):
-            raise FileNotFoundError(f"API_INFO.json not found in the folder: {folder_path}")
-        with open(api_info_path, "r", encoding="utf-8") as f:
-            self.api_info = json.load(f)
-        self.api_name = self.api_info.get("API_Name")
-        self.return_type = self.api_info.get("Return_Type", None)
+
+        # Load API information from API_INFO.json (cached per folder)
+        api_info, param_dirs, has_no_parameters = _load_api_folder(folder_path)
+        self.api_info: Dict[str, Any] = api_info
+        self._param_dirs: Tuple[str, ...] = param_dirs
+        self._has_no_parameters: bool = has_no_parameters
+        self.api_name: Optional[str] = self.api_info.get("API_Name")
+        self.return_type: Optional[str] = self.api_info.get("Return_Type", None)
         if not self.api_name:
             raise ValueError("API_INFO.json must contain the 'API_Name' field.")
 
+        # Per-instance constants reused on every generated call
+        self._normalized_return_type: Optional[str] = remove_special_characters(self.return_type) if self.return_type else None
+        self._call_prefix: str = f"{self.api_name}("
+
+        # Call shape, fixed once parameters are discovered: 'empty' | 'noname' | 'keyed'
+        self._mode: str = "empty"
+        self._noname_param_gen: Optional[ParameterGenerator] = None
+
         self._discover_parameters()
 
-    def _discover_parameters(self):
-        items = os.listdir(self.folder_path)
-        # Identify directories (treated as parameters)
-        param_dirs = [
-            item for item in items
-            if os.path.isdir(os.path.join(self.folder_path, item))
-        ]
-
-        # If no subfolders exist, check for empty.json
-        if not param_dirs:
-            if "empty.json" in items:
-                # Means this API call requires no parameters
-                self._has_no_parameters = True
-                return
-
-        # Otherwise, build ParameterGenerator for each parameter directory
-        for d in param_dirs:
-            param_path = os.path.join(self.folder_path, d)
-            self.param_generators[d] = ParameterGenerator(param_path)
-
-    def generate_api_call(self) -> str:
+    def _discover_parameters(self) -> None:
+        if self._has_no_parameters:
+            return
+
+        # Grammars are read-only after construction, so one set per folder is enough
+        key = os.path.abspath(self.folder_path)
+        cached = APIGenerator._folder_cache.get(key)
+        if cached is None:
+            # Otherwise, build ParameterGenerator for each parameter directory
+            cached = {}
+            for d in self._param_dirs:
+                param_path = os.path.join(self.folder_path, d)
+                cached[d] = ParameterGenerator(param_path)
+            APIGenerator._folder_cache[key] = cached
+        self.param_generators = cached
+
+        if not cached:
+            self._mode = "empty"
+        elif len(cached) == 1 and "NoParameterName" in cached:
+            self._mode = "noname"
+            self._noname_param_gen = cached["NoParameterName"]
+        else:
+            self._mode = "keyed"
+
+    def generate_api_call(self) -> Optional[str]:
         pass
 
 
 class MethodGenerator(APIGenerator):
     def generate_api_call_statement(self) -> str:
+        mode = self._mode
         # If no parameters are needed, return the API call with an empty parameter dictionary.
-        if self._has_no_parameters or not self.param_generators:
+        if mode == "empty":
             return f"{self.api_name}({{}})"
 
         # Special case: If there is exactly one parameter and its key is "NoParameterName",
         # generate the API call by passing the value directly without a key.
-        if len(self.param_generators) == 1 and "NoParameterName" in self.param_generators:
-            # Retrieve the only ParameterGenerator.
-            param_gen = self.param_generators["NoParameterName"]
+        if mode == "noname":
+            param_gen = self._noname_param_gen
             try:
                 generated_value = param_gen.generate_parameter()
             except Exception as e:
@@ -68,20 +108,20 @@ class MethodGenerator(APIGenerator):
                 generated_value = generate_random_string(3)
             normalized_value = normalize_generated_value(generated_value)
             # Return the API call with the parameter value passed directly.
-            return f"{self.api_name}({normalized_value})"
+            return self._call_prefix + normalized_value + ")"
 
         # Otherwise, generate each parameter's value using its ParameterGenerator,
         # and form key:value pairs for each.
-        param_expressions = []
+        param_expressions: List[str] = []
         for param_name, param_gen in self.param_generators.items():
             try:
                 generated_value = param_gen.generate_parameter()
             except Exception as e:
                 print(f"Error when generating {self.api_name}'s {param_name}")
                 generated_value = generate_random_string(3)
-            if random.random() < 0.1:
-                if generated_value == "<<BUILTINOBJ>>" or generated_value == "<<SCRIPTS>>":
-                    generated_value = generate_printable_string(8)
+            # Only placeholder values can be swapped, so only they need a draw
+            if generated_value in _PLACEHOLDER_VALUES and random.random() < 0.1:
+                generated_value = generate_printable_string(8)
             normalized_value = normalize_generated_value(generated_value)
             param_expressions.append(f"{param_name}: {normalized_value}")
 
@@ -92,63 +132,61 @@ class MethodGenerator(APIGenerator):
         return f"{self.api_name}({{{joined_params}}})"
     
 
-    def generate_api_call_raw(self) -> str:
-        return_dict = {"api_name": self.api_name}
-        return_dict["api_type"] = "method"
-        return_dict["return_type"] = self.return_type
-        return_dict["return_value"] = ""  
-        if self.return_type and self.return_type not in ("unknown", "Boolean", "String", "Integer", "Number", "void"):
-            normalize_return_type = remove_special_characters(self.return_type)
-            return_dict["return_value"] = f"{normalize_return_type}_" + generate_random_string(5)
-        # If no parameters are needed, return the API call with an empty parameter dictionary.
-        if self._has_no_parameters or not self.param_generators:  
-            return_dict['params'] = {}
-            return return_dict
+    def generate_api_call_raw(self) -> Dict[str, Any]:
+        return_value = ""
+        if self.return_type and self.return_type not in _METHOD_TRIVIAL_RETURN_TYPES:
+            return_value = f"{self._normalized_return_type}_" + generate_random_string(5)
+
+        mode = self._mode
+        param_value: Dict[str, str]
+        # If no parameters are needed, use an empty parameter dictionary.
+        if mode == "empty":
+            param_value = {}
 
         # Special case: If there is exactly one parameter and its key is "NoParameterName",
-        # generate the API call by passing the value directly without a key.
-        if len(self.param_generators) == 1 and "NoParameterName" in self.param_generators:
-            # Retrieve the only ParameterGenerator.
-            param_gen = self.param_generators["NoParameterName"]
+        # the value is passed directly without a key.
+        elif mode == "noname":
+            param_gen = self._noname_param_gen
             try:
                 generated_value = param_gen.generate_parameter()
             except Exception as e:
                 print(f"Error when generating {self.api_name}'s only param")
                 generated_value = generate_random_string(3)
-            normalized_value = normalize_generated_value(generated_value)
-            # Return the API call with the parameter value passed directly.
-            return_dict['params'] = {"NoParameterName": normalized_value}
-            return return_dict
-
-        # Otherwise, generate each parameter's value using its ParameterGenerator,
-        # and form key:value pairs for each.
-        param_value = {}
-        for param_name, param_gen in self.param_generators.items():
-            try:
-                generated_value = param_gen.generate_parameter()
-            except Exception as e:
-                print(f"Error when generating {self.api_name}'s {param_name}")
-                generated_value = generate_random_string(3)
-            if random.random() < 0.1:
-                if generated_value == "<<BUILTINOBJ>>" or generated_value == "<<SCRIPTS>>":
+            param_value = {"NoParameterName": normalize_generated_value(generated_value)}
+
+        # Otherwise, generate each parameter's value using its ParameterGenerator.
+        else:
+            param_value = {}
+            for param_name, param_gen in self.param_generators.items():
+                try:
+                    generated_value = param_gen.generate_parameter()
+                except Exception as e:
+                    print(f"Error when generating {self.api_name}'s {param_name}")
+                    generated_value = generate_random_string(3)
+                # Only placeholder values can be swapped, so only they need a draw
+                if generated_value in _PLACEHOLDER_VALUES and random.random() < 0.1:
                     generated_value = generate_printable_string(8)
-            normalized_value = normalize_generated_value(generated_value)
-            if param_name == "nPage" or param_name == "nPageNum":
-                param_value[param_name] = str(random.randint(0, 9))
-            else:
-                param_value[param_name] = normalized_value
-
-        return_dict['params'] = param_value
-
-        # Return the final API call string in key:value pair format inside curly braces.
-        return return_dict
+                normalized_value = normalize_generated_value(generated_value)
+                if param_name == "nPage" or param_name == "nPageNum":
+                    param_value[param_name] = _DIGITS[int(random.random() * 10)]
+                else:
+                    param_value[param_name] = normalized_value
+
+        # Build the result in one literal so the dict is sized up front.
+        return {
+            "api_name": self.api_name,
+            "api_type": "method",
+            "return_type": self.return_type,
+            "return_value": return_value,
+            "params": param_value,
+        }
 
 
 class PropertyGenerator(APIGenerator):
     def generate_api_call_statement(self) -> str:
         # If the API is marked as having no parameters or no parameter generators exist,
         # return an API call with an empty value.
-        if self._has_no_parameters or not self.param_generators:
+        if self._mode == "empty":
             return f"{self.api_name}"
 
         # Ensure there is exactly one parameter generator.
@@ -166,32 +204,34 @@ class PropertyGenerator(APIGenerator):
         # Generate and return the API call string in the format "API_Name = normalized_value".
         return f"{self.api_name} = {normalized_value}"
 
-    def generate_api_call_raw(self) -> str:
-        # If the API is marked as having no parameters or no parameter generators exist,
-        # return an API call with an empty value.
-        return_dict = {"api_name": self.api_name}
-        return_dict["api_type"] = "property"
-        return_dict["return_type"] = self.return_type
-        return_dict["return_value"] = ""
-        if self.return_type and self.return_type not in ("unknown", "Boolean", "String", "Integer"):
-            normalize_return_type = remove_special_characters(self.return_type)
-            return_dict["return_value"] = f"{normalize_return_type}_" + generate_random_string(5)
-        if self._has_no_parameters or not self.param_generators:
-            return_dict['params'] = {}
-            return return_dict
+    def generate_api_call_raw(self) -> Dict[str, Any]:
+        return_value = ""
+        if self.return_type and self.return_type not in _PROPERTY_TRIVIAL_RETURN_TYPES:
+            return_value = f"{self._normalized_return_type}_" + generate_random_string(5)
 
-        # Ensure there is exactly one parameter generator.
-        if len(self.param_generators) != 1:
-            raise ValueError("PropertyGenerator must have exactly one parameter generator.")
-
-        # Retrieve the single parameter generator.
-        param_gen = next(iter(self.param_generators.values()))
-        try:
-            generated_value = param_gen.generate_parameter()
-        except Exception as e:
-            print(f"Error when generating {self.api_name}'s only param")
-            generated_value = generate_random_string(3)
-        normalized_value = normalize_generated_value(generated_value)
-        # Generate and return the API call string in the format "API_Name = normalized_value".
-        return_dict['params'] = {self.api_name: normalized_value}
-        return return_dict
\ No newline at end of file
+        # If the API is marked as having no parameters or no parameter generators exist,
+        # use an empty value.
+        if self._mode == "empty":
+            param_value = {}
+        else:
+            # Ensure there is exactly one parameter generator.
+            if len(self.param_generators) != 1:
+                raise ValueError("PropertyGenerator must have exactly one parameter generator.")
+
+            # Retrieve the single parameter generator.
+            param_gen = next(iter(self.param_generators.values()))
+            try:
+                generated_value = param_gen.generate_parameter()
+            except Exception as e:
+                print(f"Error when generating {self.api_name}'s only param")
+                generated_value = generate_random_string(3)
+            param_value = {self.api_name: normalize_generated_value(generated_value)}
+
+        # Build the result in one literal so the dict is sized up front.
+        return {
+            "api_name": self.api_name,
+            "api_type": "property",
+            "return_type": self.return_type,
+            "return_value": return_value,
+            "params": param_value,
+        }
\ No newline at end of file
@@ -1,10 +1,10 @@
 import os
 import random
+import itertools
 from typing import List, Dict
 from .objectGenerator import ObjectGenerator
 from .generator_utils import build_statement_from_raw_call, replace_statement_parameter, generate_statement_with_object_hook_simple, generate_statement_with_object_hook_complex, remove_braces
 from .symbolic_execution_utils import solve_for_other_symbol
-import copy
 import json
 
 object_instances: Dict[str, List[str]] = {
@@ -50,8 +50,25 @@ object_instances: Dict[str, List[str]] = {
     "viewState": ["this.viewState"]
 }
 
+# Pick weights for the random API pool. Normal APIs used to appear 5 times in the
+# pool and limitlist APIs once, with 80% of limitlist picks redrawn: 5 : 0.2 = 25 : 1.
+_NORMAL_API_WEIGHT = 25
+_LIMIT_API_WEIGHT = 1
+# Pool keys drawn per random.choices call; picks are served from this buffer
+_API_PICK_BATCH = 256
+
+
+def _max_attempts(count: int) -> int:
+    # Retry budget for the generation loops, so generators that keep returning None can't hang them
+    return max(count * 20, 1000)
+
 
 class CodeGenerator:
+    # Fixed attribute set: no per-instance __dict__, faster attribute access in the generation loops
+    __slots__ = ('folder_path', 'config', 'object_generators', 'permenent_object_list', 'tmp_object_list',
+                 'pre_sentences', '_blocklist', '_limitlist', '_weak_relations', '_symbolic_relations',
+                 '_generators_tuple', '_return_targetable', '_api_keys', '_api_weights', '_api_cum',
+                 '_api_pick_buf', '_objects_union')
 
     def __init__(self, folder_path: str, config: dict):
         self.folder_path = folder_path
@@ -59,12 +76,20 @@ class CodeGenerator:
         self.object_generators: Dict[str, ObjectGenerator] = {}
         self.permenent_object_list = set()
         self.tmp_object_list = set()
+        # Hot-path views of the config: O(1) membership tests and pre-bound relation maps
+        self._blocklist = frozenset(self.config.get("blocklist", []))
+        self._limitlist = frozenset(self.config.get("limitlist", []))
+        self._weak_relations: Dict[str, List[str]] = self.config.get("weak_relations", {})
+        self._symbolic_relations: Dict[str, list] = self.config.get("symbolic_relations", {})
         self._init_object_generators()
+        self._build_api_key_pool()
         self.pre_sentences = self._get_instances_from_pdf()
+        # permenent_object_list | tmp_object_list, kept in step by _add_tmp
+        self._objects_union = set(self.permenent_object_list)
 
     def _init_object_generators(self):
         for object_name, instances in object_instances.items():
-            self.permenent_object_list.union(instances)
+            self.permenent_object_list.update(instances)
             subdir_path = os.path.join(self.folder_path, object_name)
             if not os.path.exists(subdir_path):
                 print(f"[X] Can't find object {object_name}")
@@ -74,12 +99,134 @@ class CodeGenerator:
             generator.object_name = object_name
             
             # Add all known instances for this object.
-            for instance in instances:
-                generator.add_permenent_instance(instance)
+            generator.add_permenent_instances(instances)
             
             # Store in dictionary with object name as key
             self.object_generators[object_name] = generator
 
+        # object_generators is fixed after init; index this instead of listing values per pick
+        self._generators_tuple = tuple(self.object_generators.values())
+        # Return types that get the returned value registered as an instance (Doc is excluded)
+        self._return_targetable = frozenset(k for k in self.object_generators if k != "Doc")
+
+    def _build_api_key_pool(self):
+        # All possible <object>.<api> combinations for random fallback, as parallel key/weight arrays
+        self._api_keys: List[str] = []
+        self._api_weights: List[int] = []
+        for obj_name, obj_gen in self.object_generators.items():
+            for api_name in obj_gen.api_list:
+                api_key = f"{obj_name}.{api_name}"
+                if api_key in self._blocklist:
+                    print(f"Find block API {api_key}")
+                elif api_key in self._limitlist:
+                    self._api_keys.append(api_key)
+                    self._api_weights.append(_LIMIT_API_WEIGHT)
+                    print(f"Find limit API {api_key}")
+                else:
+                    self._api_keys.append(api_key)
+                    self._api_weights.append(_NORMAL_API_WEIGHT)
+        self._api_cum: List[int] = list(itertools.accumulate(self._api_weights))
+        self._api_pick_buf: List[str] = []
+
+    def _pick_weighted_api_key(self):
+        # Weighted pick from the whole pool; blocklist APIs are not in it
+        if not self._api_pick_buf:
+            if not self._api_keys:
+                return None
+            self._api_pick_buf = random.choices(self._api_keys, cum_weights=self._api_cum, k=_API_PICK_BATCH)
+        return self._api_pick_buf.pop()
+
+    # Helper to pick a random API key from a small candidate list
+    def _pick_random_api_key(self, api_list):
+        pick_api = None
+        while True:
+            pick_api = random.choice(api_list) if api_list else None
+            if pick_api in self._blocklist:
+                pick_api = self._pick_weighted_api_key()
+                break
+            elif pick_api in self._limitlist:
+                if random.random() < 0.8:
+                    continue
+                else:
+                    break
+            else:
+                break
+
+        return pick_api
+
+    # Helper to parse "ObjectName.apiName" -> (object_name, api_name)
+    @staticmethod
+    def _parse_api_key(api_key: str):
+        obj_name, sep, api_name = api_key.partition('.')
+        if sep and '.' not in api_name:
+            return obj_name, api_name
+        return None, None
+
+    def _get_raw_call(self, api_key: str):
+        # Not memoized: every call draws a fresh instance and fresh parameter values
+        obj_name, api_name = self._parse_api_key(api_key)
+        obj_gen = self.object_generators.get(obj_name)
+        if obj_gen is None:
+            return None
+        return obj_gen.get_specific_api_call_raw(api_name)
+
+    def _generate_hook_code(self) -> str:
+        num_statements = random.randint(2, 8)
+        hook_statements = []
+        for _ in range(num_statements):
+            raw_call = self._get_raw_call(self._pick_weighted_api_key())
+            if not raw_call:
+                continue
+            # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
+            statement = build_statement_from_raw_call(raw_call)
+            if statement:
+                hook_statements.append(statement)
+        if not hook_statements:
+            return ""
+
+        hook_body = ' '.join(hook_statements)
+        return hook_body
+
+    def _generate_parameter_value_code(self) -> str:
+        num_statements = random.randint(2, 8)
+        hook_statements = []
+        for _ in range(num_statements):
+            raw_call = self._get_raw_call(self._pick_weighted_api_key())
+            if not raw_call:
+                continue
+            # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
+            statement = build_statement_from_raw_call(raw_call, quote="'")
+            if statement:
+                hook_statements.append(statement)
+        if not hook_statements:
+            return ""
+
+        hook_body = ' '.join(hook_statements)
+        # Wrap the hook_body with double quotes before returning
+        hook_body = f'"{hook_body}"'
+        return hook_body
+
+    def _generate_loop_statement(self) -> str:
+        loop_count = random.randint(1, 2)
+        num_statements = random.randint(2, 5)
+        loop_statements = []
+        for _ in range(num_statements):
+            raw_call = self._get_raw_call(self._pick_weighted_api_key())
+            if not raw_call:
+                continue
+            # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
+            statement = build_statement_from_raw_call(raw_call)
+            if statement:
+                loop_statements.append(statement)
+        if not loop_statements:
+            return ""
+        loop_body = ' '.join(loop_statements)
+        return f"try{{for (var i = 0; i < {loop_count}; i++) {{{loop_body}}};}} catch(e){{}};"
+
+    def _add_tmp(self, name: str):
+        self.tmp_object_list.add(name)
+        self._objects_union.add(name)
+
     def _get_instances_from_pdf(self):
         code_statements = []
         rename_doc_statement = "try{var fthis = this;} catch(e){}"
@@ -94,20 +241,31 @@ class CodeGenerator:
             get_annot_statements = f"try{{var my_annot{i} = this.getAnnot({i-1}, \"my_annot{i}\");}} catch(e){{}}"
             code_statements.append(get_annot_statements)
             code_statements.append(get_field_statements)
-            annot_generator.add_permenent_instance(f"my_annot{i}")
-            self.permenent_object_list.add(f"my_annot{i}")
-            field_generator.add_permenent_instance(f"my_field{i}")
-            self.permenent_object_list.add(f"my_field{i}")
-            
+
+        annot_names = [f"my_annot{i}" for i in range(1, 11)]
+        field_names = [f"my_field{i}" for i in range(1, 11)]
+        annot_generator.add_permenent_instances(annot_names)
+        field_generator.add_permenent_instances(field_names)
+        self.permenent_object_list.update(annot_names)
+        self.permenent_object_list.update(field_names)
+
         return code_statements
 
 
     def generate_api_statements(self, count: int) -> List[str]:
-        statements = copy.deepcopy(self.pre_sentences)
+        statements = list(self.pre_sentences)
+        if not self._generators_tuple:
+            print("[X] No object generators available")
+            return statements
         generate_count = 0
+        attempts, max_attempts = 0, _max_attempts(count)
         while generate_count < count:
+            attempts += 1
+            if attempts > max_attempts:
+                print(f"[X] Gave up after {max_attempts} attempts with {generate_count}/{count} statements")
+                break
             # Randomly choose one of the available ObjectGenerators.
-            chosen_generator = random.choice(list(self.object_generators.values()))
+            chosen_generator = self._generators_tuple[random.randrange(len(self._generators_tuple))]
             # Generate an API call statement using the chosen ObjectGenerator.
             api_call = chosen_generator.generate_api_call_statement()
             if api_call == None:
@@ -123,131 +281,31 @@ class CodeGenerator:
         for obj_name, obj_gen in self.object_generators.items():
             obj_gen.clean_instance()
         self.tmp_object_list = set()
+        self._objects_union = set(self.permenent_object_list)
         # If neither weak_relation nor symbolic_relation is set, just generate random statements.
         if not weak_relation and not symbolic_relation:
             return self.generate_api_statements(count)
 
         # statements = self._get_instances_from_pdf()
-        statements = copy.deepcopy(self.pre_sentences)
+        statements = list(self.pre_sentences)
+        if not self._api_keys:
+            print("[X] No APIs available")
+            return statements
         generated_count = 0
-
-        blocklist = self.config["blocklist"]
-        limitlist = self.config["limitlist"]
-
-        # All possible <object>.<api> combinations for random fallback
-        all_api_keys = []
-        for obj_name, obj_gen in self.object_generators.items():
-            for api_name in obj_gen.api_list:
-                api_key = f"{obj_name}.{api_name}"
-                if api_key in blocklist:
-                    print(f"Find block API {api_key}")
-                elif api_key in limitlist:
-                    all_api_keys.append(api_key)
-                    print(f"Find limit API {api_key}")
-                else:
-                    all_api_keys.extend([api_key] * 5)
-
-        # Helper to pick a random API key from all possible ones
-        def pick_random_api_key(api_list):
-            pick_api = None
-            while True:
-                pick_api = random.choice(api_list) if api_list else None
-                if pick_api in blocklist:
-                    pick_api = random.choice(all_api_keys)
-                    break
-                elif pick_api in limitlist:
-                    if random.random() < 0.8:
-                        continue
-                    else:
-                        break
-                else:
-                    break
-
-            return pick_api
-
-        # Helper to parse "ObjectName.apiName" -> (object_name, api_name)
-        def parse_api_key(api_key: str):
-            parts = api_key.split('.')
-            if len(parts) == 2:
-                return parts[0], parts[1]
-            return None, None
-        
-        def generate_hook_code() -> str:
-            num_statements = random.randint(2, 8)
-            hook_statements = []
-            for _ in range(num_statements):
-                api_key = pick_random_api_key(all_api_keys)
-                obj_name, api_name = parse_api_key(api_key)
-                if obj_name not in self.object_generators:
-                    continue
-                obj_gen = self.object_generators[obj_name]
-                raw_call = obj_gen.get_specific_api_call_raw(api_name)
-                if not raw_call:
-                    continue
-                # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
-                statement = build_statement_from_raw_call(raw_call)
-                if statement:
-                    hook_statements.append(statement)
-            if not hook_statements:
-                return ""
-            
-            hook_body = ' '.join([f'{stmt}' for stmt in hook_statements])
-            return hook_body
-        
-        def generate_parameter_value_code() -> str:
-            num_statements = random.randint(2, 8)
-            hook_statements = []
-            for _ in range(num_statements):
-                api_key = pick_random_api_key(all_api_keys)
-                obj_name, api_name = parse_api_key(api_key)
-                if obj_name not in self.object_generators:
-                    continue
-                obj_gen = self.object_generators[obj_name]
-                raw_call = obj_gen.get_specific_api_call_raw(api_name)
-                if not raw_call:
-                    continue
-                # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
-                statement = build_statement_from_raw_call(raw_call)
-                if statement:
-                    hook_statements.append(statement)
-            if not hook_statements:
-                return ""
-            
-            hook_body = ' '.join([f'{stmt}' for stmt in hook_statements])
-            hook_body = hook_body.replace('"', "'")
-            # Wrap the hook_body with double quotes before returning
-            hook_body = '"' + hook_body + '"'
-            return hook_body
-        
-        def generate_loop_statement() -> str:
-            loop_count = random.randint(1, 2)
-            num_statements = random.randint(2, 5)
-            loop_statements = []
-            for _ in range(num_statements):
-                api_key = pick_random_api_key(all_api_keys)
-                obj_name, api_name = parse_api_key(api_key)
-                if obj_name not in self.object_generators:
-                    continue
-                obj_gen = self.object_generators[obj_name]
-                raw_call = obj_gen.get_specific_api_call_raw(api_name)
-                if not raw_call:
-                    continue
-                # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
-                statement = build_statement_from_raw_call(raw_call)
-                if statement:
-                    loop_statements.append(statement)
-            if not loop_statements:
-                return ""
-            loop_body = ' '.join([f'{stmt}' for stmt in loop_statements])
-            return f"try{{for (var i = 0; i < {loop_count}; i++) {{{loop_body}}};}} catch(e){{}};"
-        
+        # Local binding: the loop below draws 4-6 floats per iteration
+        rand = random.random
+        attempts, max_attempts = 0, _max_attempts(count)
 
         while generated_count < count:
+            attempts += 1
+            if attempts > max_attempts:
+                print(f"[X] Gave up after {max_attempts} attempts with {generated_count}/{count} statements")
+                break
             # print(f"{generated_count}/{count}")
             # 1) Generate a random API call (the "first" API call).x
-            current_api_key = pick_random_api_key(all_api_keys)
+            current_api_key = self._pick_weighted_api_key()
             # Parse the fist API key
-            first_obj_name, first_api_name = parse_api_key(current_api_key)
+            first_obj_name, first_api_name = self._parse_api_key(current_api_key)
             if first_obj_name not in self.object_generators:
                 continue
             first_obj_gen = self.object_generators[first_obj_name]
@@ -255,30 +313,30 @@ class CodeGenerator:
             # If generation fails or returns None, try again
             if not first_raw_call:
                 continue
-            parameter_value_code = generate_parameter_value_code()
-            first_raw_call = replace_statement_parameter(first_raw_call, self.permenent_object_list|self.tmp_object_list, parameter_value_code)
+            parameter_value_code = self._generate_parameter_value_code()
+            first_raw_call = replace_statement_parameter(first_raw_call, self._objects_union, parameter_value_code)
             
             # Convert raw call to a statement string
             first_statement = build_statement_from_raw_call(first_raw_call)
             if not first_statement:
                 continue
 
-            p = random.random()
+            p = rand()
             if p < 0.5:
                 statements.append(first_statement)          
                 generated_count += 1
                 first_return_value = first_raw_call['return_value']
                 if first_return_value != "":
-                    self.tmp_object_list.add(first_return_value)
+                    self._add_tmp(first_return_value)
                     first_return_type = first_raw_call['return_type']
-                    if first_return_type!= "Doc" and first_return_type in self.object_generators.keys():
+                    if first_return_type in self._return_targetable:
                         generator = self.object_generators[first_return_type]
                         generator.add_instance(first_return_value)
                 if generated_count >= count:
                     break
                 continue
             elif p < 0.55:
-                loop_statement = generate_loop_statement()
+                loop_statement = self._generate_loop_statement()
                 statements.append(loop_statement)          
                 generated_count += 1
                 continue
@@ -289,22 +347,22 @@ class CodeGenerator:
             # Build the current API key from the first call
             current_api_key = f"{first_raw_call['object_name']}.{first_raw_call['api_name']}"
             # Attempt to pick a related API with 90% chance if weak_relation is True
-            if weak_relation and random.random() < 0.9:
-                related_candidates = self.config['weak_relations'].get(current_api_key, [])
+            if weak_relation and rand() < 0.9:
+                related_candidates = self._weak_relations.get(current_api_key, [])
                 if related_candidates:
-                    second_api_key = pick_random_api_key(related_candidates)
+                    second_api_key = self._pick_random_api_key(related_candidates)
                     # in case we choose an API from blocklist
-                    if second_api_key in blocklist:
+                    if second_api_key in self._blocklist:
                         second_api_key = None
 
             # If still no second_api_key chosen, pick from the entire pool
             if not second_api_key:
-                second_api_key = pick_random_api_key(all_api_keys)
+                second_api_key = self._pick_weighted_api_key()
                 if not second_api_key:
                     continue
 
             # Parse the second API key
-            second_obj_name, second_api_name = parse_api_key(second_api_key)
+            second_obj_name, second_api_name = self._parse_api_key(second_api_key)
             if second_obj_name not in self.object_generators:
                 continue
             second_obj_gen = self.object_generators[second_obj_name]
@@ -312,29 +370,26 @@ class CodeGenerator:
             # 3) If symbolic_relation is True, with a 90% chance attempt a symbolic relation
             #    between the first and second API calls.
             second_raw_call = None
-            if symbolic_relation and random.random() < 0.9:
+            if symbolic_relation and rand() < 0.9:
                 # Check if there's a symbolic relation entry for (api1 + api2) or (api2 + api1)
-                comb1 = f"{current_api_key}+{second_api_key}"
-                comb2 = f"{second_api_key}+{current_api_key}"
-                symbolic_info = None
-                if comb1 in self.config["symbolic_relations"]:
-                    symbolic_info = self.config["symbolic_relations"][comb1]
-                elif comb2 in self.config["symbolic_relations"]:
-                    symbolic_info = self.config["symbolic_relations"][comb2]
-
-                p = random.random()
+                sr = self._symbolic_relations
+                symbolic_info = sr.get(f"{current_api_key}+{second_api_key}")
+                if symbolic_info is None:
+                    symbolic_info = sr.get(f"{second_api_key}+{current_api_key}")
+
+                p = rand()
                 if p < 0.4:
-                    hook_code = generate_hook_code()
+                    hook_code = self._generate_hook_code()
                     os_name, obj_hook_code = generate_statement_with_object_hook_simple(first_raw_call, hook_code)
                     if os_name != None:
-                        self.tmp_object_list.add(os_name)
+                        self._add_tmp(os_name)
                         # generate new statement after updating
                         first_statement = obj_hook_code+ ' ' + build_statement_from_raw_call(first_raw_call)
                 elif p < 0.8:
-                    hook_code = generate_hook_code()
+                    hook_code = self._generate_hook_code()
                     os_name, obj_hook_code_with_api_call = generate_statement_with_object_hook_complex(first_raw_call, hook_code)
                     if os_name != None:
-                        self.tmp_object_list.add(os_name)
+                        self._add_tmp(os_name)
                         # generate new statement after updating
                         first_statement = obj_hook_code_with_api_call
 
@@ -344,8 +399,8 @@ class CodeGenerator:
                     second_raw_call = second_obj_gen.get_specific_api_call_raw(second_api_name)
                     if not second_raw_call:
                         continue
-                    parameter_value_code = generate_parameter_value_code()
-                    second_raw_call = replace_statement_parameter(second_raw_call, self.permenent_object_list|self.tmp_object_list, parameter_value_code)
+                    parameter_value_code = self._generate_parameter_value_code()
+                    second_raw_call = replace_statement_parameter(second_raw_call, self._objects_union, parameter_value_code)
                     for info in symbolic_info:
                         # Skip if constraint is explicitly 'none'
                         constraint = info.get("constraint", "none")
@@ -391,9 +446,9 @@ class CodeGenerator:
                     for raw_call in [first_raw_call, second_raw_call]:
                         return_value = raw_call['return_value']
                         if return_value != "":
-                            self.tmp_object_list.add(return_value)
+                            self._add_tmp(return_value)
                             return_type = raw_call['return_type']
-                            if return_type!= "Doc" and return_type in self.object_generators.keys():
+                            if return_type in self._return_targetable:
                                 self.object_generators[return_type].add_instance(return_value)
                     
                     
@@ -406,8 +461,8 @@ class CodeGenerator:
                     second_raw_call = second_obj_gen.get_specific_api_call_raw(second_api_name)
                     if not second_raw_call:
                         continue
-                    parameter_value_code = generate_parameter_value_code()
-                    second_raw_call = replace_statement_parameter(second_raw_call, self.permenent_object_list|self.tmp_object_list, parameter_value_code)
+                    parameter_value_code = self._generate_parameter_value_code()
+                    second_raw_call = replace_statement_parameter(second_raw_call, self._objects_union, parameter_value_code)
                     second_statement = build_statement_from_raw_call(second_raw_call)
                     statements.append(first_statement)
                     statements.append(second_statement)
@@ -416,9 +471,9 @@ class CodeGenerator:
                     for raw_call in [first_raw_call, second_raw_call]:
                         return_value = raw_call['return_value']
                         if return_value != "":
-                            self.tmp_object_list.add(return_value)
+                            self._add_tmp(return_value)
                             return_type = raw_call['return_type']
-                            if return_type != "Doc" and return_type in self.object_generators.keys():
+                            if return_type in self._return_targetable:
                                 self.object_generators[return_type].add_instance(return_value)
                         
                     generated_count += 2
@@ -430,8 +485,8 @@ class CodeGenerator:
                 second_raw_call = second_obj_gen.get_specific_api_call_raw(second_api_name)
                 if not second_raw_call:
                     continue
-                parameter_value_code = generate_parameter_value_code()
-                second_raw_call = replace_statement_parameter(second_raw_call, self.permenent_object_list|self.tmp_object_list, parameter_value_code)
+                parameter_value_code = self._generate_parameter_value_code()
+                second_raw_call = replace_statement_parameter(second_raw_call, self._objects_union, parameter_value_code)
                 second_statement = build_statement_from_raw_call(second_raw_call)
                 statements.append(first_statement)
                 statements.append(second_statement)
@@ -440,9 +495,9 @@ class CodeGenerator:
                 for raw_call in [first_raw_call, second_raw_call]:
                     return_value = raw_call['return_value']
                     if return_value != "":
-                        self.tmp_object_list.add(return_value)
+                        self._add_tmp(return_value)
                         return_type = raw_call['return_type']
-                        if return_type != "Doc" and return_type in self.object_generators.keys():
+                        if return_type in self._return_targetable:
                             self.object_generators[return_type].add_instance(return_value)
                     
                 generated_count += 2
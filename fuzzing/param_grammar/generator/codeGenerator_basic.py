@@ -59,7 +59,7 @@ class CodeGenerator_basic:
 
     def _init_object_generators(self):
         for object_name, instances in object_instances.items():
-            self.permenent_object_list.union(instances)
+            self.permenent_object_list.update(instances)
             subdir_path = os.path.join(self.folder_path, object_name)
             if not os.path.exists(subdir_path):
                 print(f"[X] Can't find object {object_name}")
@@ -78,6 +78,9 @@ class CodeGenerator_basic:
 
     def generate_api_statements(self, count: int) -> List[str]:
         statements = []
+        if not self.object_generators:
+            print("[X] No object generators available")
+            return statements
         generate_count = 0
         while generate_count < count:
             # Randomly choose one of the available ObjectGenerators.
@@ -119,6 +122,9 @@ class CodeGenerator_basic:
                     print(f"Find limit API {api_key}")
                 else:
                     all_api_keys.extend([api_key] * 5)
+        if not all_api_keys:
+            print("[X] No APIs available")
+            return statements
 
         # Helper to pick a random API key from all possible ones
         def pick_random_api_key(api_list):
@@ -158,16 +164,15 @@ class CodeGenerator_basic:
                 if not raw_call:
                     continue
                 # raw_call = replace_statement_parameter(raw_call, self.permenent_object_list | self.tmp_object_list)
-                statement = build_statement_from_raw_call(raw_call)
+                statement = build_statement_from_raw_call(raw_call, quote="'")
                 if statement:
                     hook_statements.append(statement)
             if not hook_statements:
                 return ""
             
-            hook_body = ' '.join([f'{stmt}' for stmt in hook_statements])
-            hook_body = hook_body.replace('"', "'")
+            hook_body = ' '.join(hook_statements)
             # Wrap the hook_body with double quotes before returning
-            hook_body = '"' + hook_body + '"'
+            hook_body = f'"{hook_body}"'
             return hook_body
 
         while generated_count < count:
@@ -1,32 +1,63 @@
+import bisect
 import random
 
 # Predefined special cases to enhance test coverage
-interesting_str = [
+interesting_str = (
     '''"a" + String.fromCharCode(0x4141)''',
     '''"\\\\xfe\\\\xff"''',
     '''"https://invalid.noexist.com/abc"'''
-]
+)
+
+# JavaScript-specific numeric edge cases for generate_edge_case
+_EDGE_CASES = (
+    '0', '-0', '-1', '0x7fffffff', '0xffffffff',
+    '9007199254740991',  # MAX_SAFE_INTEGER
+    '9007199254740992',  # MAX_SAFE_INTEGER + 1
+    '1.7976931348623157e+308',  # MAX_VALUE
+    '5e-324',            # MIN_VALUE
+    '0.000000000000000000001',
+    '123456789012345678901234567890',
+    '0xdeadbeef'
+)
+
+# ASCII lookup: the character itself if it may appear unescaped in a literal
+# (printable, except '"' and '\\'), otherwise None
+_PLAIN_CHARS = tuple(
+    chr(i) if 0x20 <= i < 0x7F and i not in (0x22, 0x5C) else None
+    for i in range(0x80)
+)
+
+# Precomputed escape sequences for code points up to 0xFF, indexed by code point;
+# the rest of the BMP is formatted on demand
+_HEX_ESC = tuple('\\\\x%02x' % i for i in range(0x100))
+_U_ESC = tuple('\\\\u%04x' % i for i in range(0x100))
+
+# generate_code_point bands: (cumulative probability, first code point, number of code points)
+_CODE_POINT_BANDS = (
+    (0.35, 0x0000, 0xD800),     # BMP below the surrogate range (70% BMP in total,
+    (0.7, 0xE000, 0x2000),      # each half equally likely)
+    (0.95, 0x10000, 0x100000),  # 25% Supplementary Planes
+    (0.975, 0x0, 0x20),         # 5% control characters, half of them DEL
+    (1.0, 0x7F, 1),
+)
 
 def generate_code_point():
     """Generate valid Unicode code points (0x0 to 0x10FFFF)"""
+    # One draw: r picks the band, and its position inside the band picks the code point
     r = random.random()
-    if r < 0.7:  # 70% probability for Basic Multilingual Plane (BMP)
-        # Exclude surrogate range (0xD800-0xDFFF)
-        return random.choice([
-            random.randint(0x0000, 0xD7FF),
-            random.randint(0xE000, 0xFFFF)
-        ])
-    elif r < 0.95:  # 25% probability for Supplementary Planes
-        return random.randint(0x10000, 0x10FFFF)
-    else:  # 5% probability for control characters
-        return random.choice([random.randint(0x0, 0x1F), 0x7F])
+    lo = 0.0
+    for hi, first, size in _CODE_POINT_BANDS:
+        if r < hi:
+            return first + min(int((r - lo) / (hi - lo) * size), size - 1)
+        lo = hi
+    return 0x7F
 
 def escape_code_point(code_point):
     """Generate JavaScript escape sequences"""
     
     # Hexadecimal escapes
     if code_point <= 0xFF and random.random() < 0.3:
-        return '\\\\x%02x' % code_point
+        return _HEX_ESC[code_point]
     
     # Handle supplementary characters with surrogate pairs
     if code_point > 0xFFFF:
@@ -37,59 +68,52 @@ def escape_code_point(code_point):
         return '\\\\u%04x\\\\u%04x' % (high, low)
     
     # Standard 4-digit Unicode escapes
+    if code_point <= 0xFF:
+        return _U_ESC[code_point]
     return '\\\\u%04x' % code_point
 
 def generate_literal():
     """Generate string literals"""
+    rand = random.random
     length = int(abs(random.gauss(8, 10)))
     length = max(0, min(length, 2000))
     
     chars = []
+    append = chars.append
     for _ in range(length):
         cp = generate_code_point()
-        
-        # Mandatory escaping cases
-        if cp in (0x22, 0x5C) or (0x00 <= cp <= 0x1F):
-            chars.append(escape_code_point(cp))
-            continue
-            
-        # 30% probability to force escaping
-        if random.random() < 0.3:
-            chars.append(escape_code_point(cp))
-            continue
-            
-        # Try direct character representation
-        try:
-            c = chr(cp)
-            if 0x20 <= cp <= 0x7E and cp not in (0x22, 0x5C):
-                chars.append(c)
-            else:
-                chars.append(escape_code_point(cp))
-        except:
-            chars.append(escape_code_point(cp))
-
-    # 10% probability to add BOM
-    if random.random() < 0.1:
-        chars.insert(0, '\\\\xfe\\\\xff')
-    if random.random() < 0.1:
-        chars.append('\\\\xff\\\\xfe')
+        # Only plain printable ASCII is emitted directly, and 30% of it is escaped anyway;
+        # quotes, backslashes, control and non-ASCII characters are always escaped
+        if cp < 0x80:
+            ch = _PLAIN_CHARS[cp]
+            if ch is not None and rand() >= 0.3:
+                append(ch)
+                continue
+        append(escape_code_point(cp))
 
-    return '"%s"' % ''.join(chars)
+    # 10% probability to add BOM; prefixed in the final format rather than shifting the list
+    bom = '\\\\xfe\\\\xff' if rand() < 0.1 else ''
+    if rand() < 0.1:
+        append('\\\\xff\\\\xfe')
+
+    return '"%s%s"' % (bom, ''.join(chars))
 
 
 def generate_dynamic():
     """Generate dynamic construction expressions"""
+    rand = random.random
     parts = []
+    append = parts.append
     for _ in range(random.randint(1, 5)):
-        if random.random() < 0.5:
-            parts.append(generate_literal())
+        if rand() < 0.5:
+            append(generate_literal())
         else:
             cp = generate_code_point()
             # method = 'String.fromCodePoint' if cp > 0xFFFF else 'String.fromCharCode'
             method = 'String.fromCharCode'
-            parts.append(f'{method}(0x{cp:x})')
+            append(f'{method}(0x{cp:x})')
     
-    if random.random() < 0.5:
+    if rand() < 0.5:
         return 'String(%s)' % ' + '.join(parts)
     return ' + '.join(parts)
 
@@ -121,33 +145,12 @@ def rand_str():
 
 def rand_num():
     """Generate high-quality random numeric strings for JavaScript engine testing"""
-    choices = [
-        ('integer', 20),       # Basic integers
-        ('float', 15),         # Floating point numbers
-        ('scientific', 15),    # Scientific notation
-        ('hex', 15),           # Hexadecimal values
-        ('special', 5),        # Special values (Infinity/NaN)
-        ('huge', 15),          # Extremely large numbers
-        ('edge_case', 15),     # JavaScript-specific edge cases
-    ]
-    types, weights = zip(*choices)
-    selected_type = random.choices(types, weights=weights, k=1)[0]
-
-    # Dispatch to corresponding generator based on selected type
-    if selected_type == 'integer':
-        return generate_integer()
-    elif selected_type == 'float':
-        return generate_float()
-    elif selected_type == 'scientific':
-        return generate_scientific()
-    elif selected_type == 'hex':
-        return generate_hex()
-    elif selected_type == 'special':
-        return generate_special_number()
-    elif selected_type == 'huge':
-        return generate_huge()
-    elif selected_type == 'edge_case':
-        return generate_edge_case()
+    # Same bisect over cumulative weights that random.choices performs, without rebuilding them
+    return _NUM_GENERATORS[bisect.bisect(_NUM_CUM_WEIGHTS, random.random() * 100)]()
+
+def _random_digits(n):
+    """Generate n independent uniform decimal digits from a single draw"""
+    return '%0*d' % (n, random.randrange(10 ** n))
 
 def generate_integer():
     """Generate integers with various characteristics"""
@@ -171,7 +174,9 @@ def generate_integer():
 
 def generate_float():
     """Generate floating-point numbers with different formats"""
-    sign = '-' if random.random() < 0.3 else ''
+    rand = random.random
+    randint = random.randint
+    sign = '-' if rand() < 0.3 else ''
     structure = random.choice(['int.frac', '.frac'])  # Different float formats
     
     int_part = ''
@@ -180,19 +185,20 @@ def generate_float():
     
     frac_part = ''
     if 'frac' in structure:
-        frac_part = ''.join(random.choices('0123456789', k=random.randint(1, 6)))
+        frac_part = _random_digits(randint(1, 6))
         # Add trailing zeros with 30% probability
-        if random.random() < 0.3:
-            frac_part += '0' * random.randint(1, 3)
+        if rand() < 0.3:
+            frac_part += '0' * randint(1, 3)
     
     return f"{sign}{int_part}.{frac_part}" if structure == 'int.frac' else \
            f"{sign}.{frac_part}"
 
 def generate_scientific():
     """Generate numbers in scientific notation"""
+    choice = random.choice
     mantissa = generate_float() if random.random() < 0.5 else generate_integer()
-    e_char = random.choice(['e', 'E'])  # Both lowercase and uppercase
-    exp_sign = random.choice(['+', '-', ''])  # Optional exponent sign
+    e_char = choice(['e', 'E'])  # Both lowercase and uppercase
+    exp_sign = choice(['+', '-', ''])  # Optional exponent sign
     exp = str(random.randint(0, 308))     # Exponent range matching JS limits
     return f"{mantissa}{e_char}{exp_sign}{exp}"
 
@@ -210,20 +216,31 @@ def generate_huge():
     """Generate extremely large numbers for stress testing"""
     sign = '-' if random.random() < 0.3 else ''
     num_length = random.randint(20, 30)
-    first_digit = random.choice('123456789')
-    rest_digits = ''.join(random.choices('0123456789', k=num_length-1))
-    return f"{sign}{first_digit}{rest_digits}"
+    # Uniform over num_length-digit numbers: first digit 1-9, the rest 0-9
+    digits = str(random.randrange(10 ** (num_length - 1), 10 ** num_length))
+    return f"{sign}{digits}"
 
 def generate_edge_case():
     """Generate JavaScript-specific edge cases"""
-    cases = [
-        '0', '-0', '-1', '0x7fffffff', '0xffffffff', 
-        '9007199254740991',  # MAX_SAFE_INTEGER
-        '9007199254740992',  # MAX_SAFE_INTEGER + 1
-        '1.7976931348623157e+308',  # MAX_VALUE
-        '5e-324',            # MIN_VALUE
-        '0.000000000000000000001',
-        '123456789012345678901234567890',
-        '0xdeadbeef'
-    ]
-    return random.choice(cases)
\ No newline at end of file
+    return random.choice(_EDGE_CASES)
+
+
+# rand_num dispatch: cumulative weights out of 100 and the matching generators
+_NUM_CUM_WEIGHTS = (
+    20,     # Basic integers
+    35,     # Floating point numbers
+    50,     # Scientific notation
+    65,     # Hexadecimal values
+    70,     # Special values (Infinity/NaN)
+    85,     # Extremely large numbers
+    100,    # JavaScript-specific edge cases
+)
+_NUM_GENERATORS = (
+    generate_integer,
+    generate_float,
+    generate_scientific,
+    generate_hex,
+    generate_special_number,
+    generate_huge,
+    generate_edge_case,
+)
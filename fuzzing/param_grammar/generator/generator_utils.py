@@ -2,28 +2,38 @@ import random
 import string
 import re
 import json
+import functools
 from .counter_factual_utils import rand_num, rand_str
 
+_U_BRACE_RE = re.compile(r'\\u\{([0-9A-Fa-f]+)\}')
+# Characters that are not allowed in generated identifiers
+_SPECIAL_RE = re.compile(r'[,.\[\]{}()\'"<> ]')
+# Characters dropped from normalized string values and object keys
+_STRIP_TABLE = str.maketrans('', '', '"\\\n\r()')
+_OPEN_BRACKETS = frozenset('[{')
+_CLOSE_BRACKETS = frozenset(']}')
+_NUM_RE = re.compile(r'-?(?:\d+\.?\d*|\.\d+)')
+# Opening bracket -> (closing bracket, inferred type)
+_BRACKET_TYPES = {'[': (']', 'array'), '{': ('}', 'object')}
+# Every JSON-quoted 3-letter 'abcdef' string, for generate_object_with_method property values
+_QUOTED_STR3 = tuple(json.dumps(a + b + c) for a in 'abcdef' for b in 'abcdef' for c in 'abcdef')
+
+
+def _u_brace_repl(m):
+    cp = int(m.group(1), 16)
+    return '\\u%04X' % cp
+
 
 def remove_braces(s: str) -> str:
     """
     convert '\\u{47d}\\u{f197}\\u{b5fb}\\u{f907}' to '\\u047d\\uF197\\uB5FB\\uF907'
     """
-    pattern = re.compile(r'\\u\{([0-9A-Fa-f]+)\}')
-    
-    def repl(m):
-        cp_hex = m.group(1)
-        cp = int(cp_hex, 16)
-        return '\\u%04X' % cp
-    
-    return pattern.sub(repl, s)
+    return _U_BRACE_RE.sub(_u_brace_repl, s)
 
 
 def remove_special_characters(text):
-    # Regex pattern matching specified characters
-    pattern = r'[,.\[\]{}()\'"<> ]'
     # Remove matched characters and return
-    return re.sub(pattern, '', text)
+    return _SPECIAL_RE.sub('', text)
 
 def generate_random_string(length: int) -> str:
     characters = string.ascii_letters + string.digits
@@ -42,8 +52,7 @@ def replace_statement_parameter(return_dict: dict, obj_set: set, hook_code: str)
     if len(obj_list) == 0:
         obj_list = ['this']
 
-    for param_name in params.keys():
-        param_value = params[param_name]
+    for param_name, param_value in params.items():
         if param_value == '"<<BUILTINOBJ>>"':
             return_dict['params'][param_name] = random.choice(obj_list)
         elif param_value =='"<<SCRIPTS>>"':
@@ -51,7 +60,8 @@ def replace_statement_parameter(return_dict: dict, obj_set: set, hook_code: str)
             # param_value = random.choice(obj_list)
     
     # for key in params:
-    key = random.choice(list(params.keys()))
+    # Iterating the dict yields its keys, so the tuple is the only copy made
+    key = random.choice((*params,))
     # Determine replacement probability based on key prefix
     replace_prob = 0.4 if key.startswith('o') else 0
     
@@ -62,6 +72,11 @@ def replace_statement_parameter(return_dict: dict, obj_set: set, hook_code: str)
     return return_dict
 
 
+def _random_suffix() -> str:
+    # Uniform over the same 65536 four-hex-digit names, from a single 16-bit draw
+    return '%04x' % random.getrandbits(16)
+
+
 def generate_define_properties_code(
     object_properties: list,
     prop_key: str,
@@ -69,7 +84,7 @@ def generate_define_properties_code(
     hook_code: str = "",
 ) -> str:
     # Generate random 4-character hex suffix
-    suffix = ''.join(random.choices('abcdef0123456789', k=4))
+    suffix = _random_suffix()
     
     # Create variable names following original pattern
     f_name = f"f_{suffix}"
@@ -98,12 +113,14 @@ def generate_statement_with_object_hook_complex(return_dict: dict, hook_code="")
     api_type = return_dict.get("api_type")
     if api_type != "method":
         return None, None
-    key = random.choice(list(params.keys()))
-    value = return_dict['params'][key]
-
+    # One pass builds the key:value expressions and the key list for the pick
+    keys = []
     param_expressions = []
-    for key, value in params.items():
-        param_expressions.append(f"{key}: {value}")
+    for param_name, param_value in params.items():
+        keys.append(param_name)
+        param_expressions.append(f"{param_name}: {param_value}")
+    key = random.choice(keys)
+    value = params[key]
 
     os_name, object_generate_statement = generate_define_properties_code(param_expressions, key, value, hook_code)
 
@@ -120,7 +137,7 @@ def generate_statement_with_object_hook_simple(return_dict: dict, hook_code=""):
     params = return_dict.get("params", {})
     if not params:
         return None, None
-    key = random.choice(list(params.keys()))
+    key = random.choice((*params,))
 
     value = return_dict['params'][key]
 
@@ -132,7 +149,7 @@ def generate_statement_with_object_hook_simple(return_dict: dict, hook_code=""):
 
 
 def generate_object_with_method(value, hook_code=""):
-    suffix = ''.join(random.choices('abcdef0123456789', k=4))
+    suffix = _random_suffix()
     
     # Generate names
     f_name = f"f_{suffix}"
@@ -140,20 +157,20 @@ def generate_object_with_method(value, hook_code=""):
     os_name = f"os_{suffix}"
     
     # Choose method randomly
-    method = random.choice(['toString', 'valueOf'])
+    method = random.choice(('toString', 'valueOf'))
 
     # generate random property for object
     prop_defs = []
     for _ in range(random.randint(1, 3)):
-        key = random.choice(['p', 'k', 'x']) + ''.join(random.choices('0123456789', k=random.randint(1, 2)))
+        key = random.choice(('p', 'k', 'x')) + ''.join(random.choices('0123456789', k=random.randint(1, 2)))
         
-        val_type = random.choice(['num', 'str', 'bool', 'null'])
+        val_type = random.choice(('num', 'str', 'bool', 'null'))
         if val_type == 'num':
-            val = str(random.choice([0, 1, 123, 0x7fffffff, -1]))
+            val = str(random.choice((0, 1, 123, 0x7fffffff, -1)))
         elif val_type == 'str':
-            val = json.dumps(''.join(random.choices('abcdef', k=3)))
+            val = random.choice(_QUOTED_STR3)
         elif val_type == 'bool':
-            val = random.choice(['true', 'false'])
+            val = random.choice(('true', 'false'))
         else:
             val = 'null'
         
@@ -186,53 +203,49 @@ def construct_statement(return_dict: dict) -> str:
         return None
 
     if api_type == "method":
-        # If no parameters, return the API call with an empty parameter dictionary.
+        # Pick the argument text for the call shape, then wrap it once.
         if not params:
-            if return_value != "":
-                return f"var {return_value}; {return_value} = {instance_name}.{api_name}();"
-            return f"{instance_name}.{api_name}();"
-        
+            call = f"{instance_name}.{api_name}()"
         # Special case: if there is exactly one parameter with key "NoParameterName",
-        # return the API call with the value passed directly.
-        if len(params) == 1 and "NoParameterName" in params:
-            value = params["NoParameterName"]
-            if return_value != "":
-                return f"var {return_value}; {return_value} = {instance_name}.{api_name}({value});"
-            return f"{instance_name}.{api_name}({value});"
-        
+        # the value is passed directly.
+        elif len(params) == 1 and "NoParameterName" in params:
+            call = f"{instance_name}.{api_name}({params['NoParameterName']})"
         # Otherwise, build the API call by joining key:value pairs.
-        param_expressions = []
-        for key, value in params.items():
-            param_expressions.append(f"{key}: {value}")
-        joined_params = ", ".join(param_expressions)
+        else:
+            joined_params = ", ".join([f"{key}: {value}" for key, value in params.items()])
+            call = f"{instance_name}.{api_name}({{{joined_params}}})"
         if return_value != "":
-            return f"var {return_value}; {return_value} = {instance_name}.{api_name}({{{joined_params}}});"
-        return f"{instance_name}.{api_name}({{{joined_params}}});"
-    
+            return f"var {return_value}; {return_value} = {call};"
+        return f"{call};"
+
     elif api_type == "property":
+        prop = f"{instance_name}.{api_name}"
         # If no parameters, return just the API name.
         if not params:
             if return_value != "":
-                return f"var {return_value}; {return_value} = {instance_name}.{api_name};"
-            return f"{instance_name}.{api_name};"
-        
+                return f"var {return_value}; {return_value} = {prop};"
+            return f"{prop};"
+
         # For property type, ensure there is exactly one parameter.
         if len(params) != 1:
             raise ValueError("Property type API must have exactly one parameter.")
-        
+
         # Retrieve the single parameter's value (ignoring its key) and return in assignment format.
-        value = list(params.values())[0]
+        value = next(iter(params.values()))
         if return_value != "":
-            return f"{instance_name}.{api_name} = {value}; var {return_value}; {return_value} = {instance_name}.{api_name};"
-        return f"{instance_name}.{api_name} = {value};"
+            return f"{prop} = {value}; var {return_value}; {return_value} = {prop};"
+        return f"{prop} = {value};"
     else:
         # If the API type is unknown, raise an error.
-        raise ValueError("Unknown API type.")  
-    
+        raise ValueError("Unknown API type.")
 
-def build_statement_from_raw_call(return_dict: dict) -> str:
+
+def build_statement_from_raw_call(return_dict: dict, quote: str = '"') -> str:
     api_call_str = construct_statement(return_dict)
     if api_call_str:
+        # Statements embedded in a double-quoted JS string need their quotes swapped
+        if quote != '"':
+            api_call_str = api_call_str.replace('"', quote)
         return f"try{{{api_call_str}}} catch(e){{}};"
     return None
 
@@ -240,50 +253,17 @@ def build_statement_from_raw_call(return_dict: dict) -> str:
 def infer_value_type(value: str) -> str:
     value = value.strip()
     
-    # Check for array type.
-    if value.startswith('[') and value.endswith(']'):
-        return 'array'
-    
-    # Check for object type.
-    if value.startswith('{') and value.endswith('}'):
-        return 'object'
+    # Check for array or object type: matching outer brackets.
+    bracket = _BRACKET_TYPES.get(value[:1])
+    if bracket is not None and value.endswith(bracket[0]):
+        return bracket[1]
     
     # Check for boolean type.
     if value == "true" or value == "false":
         return 'boolean'
     
-    # Check for number type.
-    def is_number(s: str) -> bool:
-        """
-        Check if the string represents a valid number.
-        A valid number must have:
-        - An optional leading '-' sign.
-        - At least one digit.
-        - At most one '.' character.
-        """
-        if not s:
-            return False
-
-        if s[0] == '-':
-            s = s[1:]
-            if not s:
-                return False
-
-        dot_count = 0
-        has_digit = False
-        for char in s:
-            if char.isdigit():
-                has_digit = True
-            elif char == '.':
-                dot_count += 1
-                if dot_count > 1:
-                    return False
-            else:
-                return False
-        return has_digit
-
-
-    if is_number(value):
+    # Check for number type: optional '-', at least one digit, at most one '.'.
+    if _NUM_RE.fullmatch(value):
         return 'number'
     
     return 'string'
@@ -291,141 +271,167 @@ def infer_value_type(value: str) -> str:
 
 def parse_array_elements(s: str) -> list:
     elements = []
-    current = []       # Accumulate characters for the current element.
+    start = 0          # Start index of the current element in s.
     bracket_level = 0  # Level for nested brackets/braces.
     in_quotes = False  # Whether we are inside double quotes.
     escape = False     # Whether the current character is escaped.
 
-    for char in s:
+    for i, char in enumerate(s):
         if escape:
-            current.append(char)
             escape = False
             continue
-
         if char == '\\':
             escape = True
-            current.append(char)
             continue
-
         if char == '"':
             in_quotes = not in_quotes
-            current.append(char)
+            continue
+        if in_quotes:
             continue
 
-        if not in_quotes:
-            if char in ['[', '{']:
-                bracket_level += 1
-            elif char in [']', '}']:
-                bracket_level -= 1
-
-            # Split on comma only if at the top level.
-            if char == ',' and bracket_level == 0:
-                element = ''.join(current).strip()
-                elements.append(element)
-                current = []
-                continue
-
-        current.append(char)
+        if char in _OPEN_BRACKETS:
+            bracket_level += 1
+        elif char in _CLOSE_BRACKETS:
+            bracket_level -= 1
+        # Split on comma only if at the top level.
+        elif char == ',' and bracket_level == 0:
+            elements.append(s[start:i].strip())
+            start = i + 1
 
-    if current:
-        element = ''.join(current).strip()
-        if element:
-            elements.append(element)
+    element = s[start:].strip()
+    if element:
+        elements.append(element)
 
     return elements
 
 
 def parse_object_members(s: str) -> list:
-    members = []
-    current = []       # Accumulate characters for the current member.
+    result = []
+    start = 0          # Start index of the current member in s.
+    colon_index = None # First top-level colon of the current member.
     bracket_level = 0  # Counter for nested structures.
     in_quotes = False  # Flag for being inside double quotes.
     escape = False     # Flag for escaping characters.
 
-    # First, split the object members by comma at the top level.
-    for char in s:
+    def add_member(end):
+        # Split the member into key and value at its first top-level colon.
+        if colon_index is not None:
+            key = s[start:colon_index].strip()
+            value_part = s[colon_index + 1:end].strip()
+        else:
+            # If no colon is found, treat the entire member as the key with an empty value.
+            key = s[start:end].strip()
+            value_part = ""
+            if not key:
+                return
+        result.append((key, value_part))
+
+    # Split the object members by comma at the top level, noting each member's colon on the way.
+    for i, char in enumerate(s):
         if escape:
-            current.append(char)
             escape = False
             continue
-
         if char == '\\':
             escape = True
-            current.append(char)
             continue
-
         if char == '"':
             in_quotes = not in_quotes
-            current.append(char)
+            continue
+        if in_quotes:
             continue
 
-        if not in_quotes:
-            if char in ['{', '[']:
-                bracket_level += 1
-            elif char in ['}', ']']:
-                bracket_level -= 1
+        if char in _OPEN_BRACKETS:
+            bracket_level += 1
+        elif char in _CLOSE_BRACKETS:
+            bracket_level -= 1
+        elif bracket_level == 0:
+            if char == ':' and colon_index is None:
+                colon_index = i
+            elif char == ',':
+                add_member(i)
+                start = i + 1
+                colon_index = None
+
+    add_member(len(s))
+    return result
 
-            if char == ',' and bracket_level == 0:
-                member = ''.join(current).strip()
-                if member:
-                    members.append(member)
-                current = []
-                continue
 
-        current.append(char)
+# Deterministic leaf normalizers; grammars repeat the same terminals, so cache them.
+# The random parts (counter-factual swaps, object key letters) stay in normalize_generated_value.
+@functools.lru_cache(maxsize=8192)
+def _normalize_string(value: str) -> str:
+    # Remove existing wrapping quotes, if any.
+    if value.startswith('"') and value.endswith('"'):
+        content = value[1:-1]
+    else:
+        content = value
 
-    if current:
-        member = ''.join(current).strip()
-        if member:
-            members.append(member)
+    # Drop double quotes, backslashes, newlines and parentheses from the content.
+    normalized_content = content.translate(_STRIP_TABLE)
 
-    # Now, split each member into key and value using the first colon at the top level.
-    result = []
-    for member in members:
-        colon_index = None
-        bracket_level = 0
-        in_quotes = False
-        escape = False
-
-        for i, char in enumerate(member):
-            if escape:
-                escape = False
-                continue
-            if char == '\\':
-                escape = True
-                continue
-            if char == '"':
-                in_quotes = not in_quotes
-                continue
-            if not in_quotes:
-                if char in ['{', '[']:
-                    bracket_level += 1
-                elif char in ['}', ']']:
-                    bracket_level -= 1
-                if char == ':' and bracket_level == 0:
-                    colon_index = i
-                    break
+    return f'"{normalized_content}"'
 
-        if colon_index is not None:
-            key = member[:colon_index].strip()
-            value_part = member[colon_index + 1:].strip()
-        else:
-            # If no colon is found, treat the entire member as the key with an empty value.
-            key = member.strip()
-            value_part = ""
 
-        result.append((key, value_part))
-    return result
+@functools.lru_cache(maxsize=8192)
+def _normalize_number(value: str) -> str:
+    # handle octal
+    if len(value) > 2 and value[1] in ('o', 'O', 'b', 'B'):
+        value[1] = '9'
+        value = value[1:]
+    
+    # Remove all leading zeros from the number while preserving sign and fractional part.
+    sign = ""
+    num_str = value
+
+    if num_str.startswith("-"):
+        sign = "-"
+        num_str = num_str[1:]
+
+    if "." in num_str:
+        int_part, frac_part = num_str.split(".", 1)
+        int_part = int_part.lstrip("0")
+        if int_part == "":
+            int_part = "0"
+        return sign + int_part + "." + frac_part
+    else:
+        num_str = num_str.lstrip("0")
+        if num_str == "":
+            num_str = "0"
+        return sign + num_str
 
 
-def normalize_generated_value(value: str) -> str:
-    inferred_type = infer_value_type(value)
+def _normalize_key(key: str) -> str:
+    # Remove existing quotes if present.
+    if key.startswith('"') and key.endswith('"'):
+        key_content = key[1:-1]
+    else:
+        key_content = key
+
+    # If the key does not start with an alphabet letter, prepend a random letter.
+    if key_content and not key_content[0].isalpha():
+        random_letter = random.choice(string.ascii_letters)
+        key_content = random_letter + key_content
+
+    # Drop double quotes, backslashes, newlines and parentheses from the key.
+    escaped_key = key_content.translate(_STRIP_TABLE)
+    return f'"{escaped_key}"'
 
-    p_counter_factual = random.random()
 
+def _normalize_node(value: str):
+    """
+    Normalize a scalar, or open a container: returns the final string, or an
+    (is_object, members iterator, normalized parts) frame for the caller to fill.
+    """
+    # Booleans are returned unchanged, so skip type inference for the bare literals
+    if value == "true" or value == "false":
+        return value
+
+    inferred_type = infer_value_type(value)
+
+    # The counter factual draw is only taken for the scalar types that use it
     if inferred_type == 'string':
         # small chance to replace with counter factual string
-        if p_counter_factual < 0.01:
+        if random.random() < 0.01:
             value = rand_str()
             return value
             # normalized_content = ""
@@ -435,31 +441,15 @@ def normalize_generated_value(value: str) -> str:
             #     else:
             #         normalized_content += char
             # return normalized_content
-        # Remove existing wrapping quotes, if any.
-        if value.startswith('"') and value.endswith('"'):
-            content = value[1:-1]
-        else:
-            content = value
-
-        # Escape double quotes and backslashes in the content.
-        normalized_content = ""
-        for char in content:
-            if char in ('"', '\\', '\n', '\r', "(", ")"):
-                normalized_content += ""
-            else:
-                normalized_content += char
-
-        return f'"{normalized_content}"'
+        return _normalize_string(value)
 
     elif inferred_type == 'array':
         # Remove the outer square brackets.
         content = value[1:-1].strip()
         if not content:
             return "[]"
-        # Parse and normalize each array element.
-        elements = parse_array_elements(content)
-        normalized_elements = [normalize_generated_value(elem) for elem in elements]
-        return "[" + ", ".join(normalized_elements) + "]"
+        # Parse the array elements; each is normalized when the walk reaches it.
+        return (False, iter(parse_array_elements(content)), [])
 
     elif inferred_type == 'object':
         # Remove the outer curly braces.
@@ -467,67 +457,49 @@ def normalize_generated_value(value: str) -> str:
         if not content:
             return "{}"
         # Parse the object members into key-value pairs.
-        members = parse_object_members(content)
-        normalized_pairs = []
-
-        for key, val in members:
-            # Normalize the key.
-            # Remove existing quotes if present.
-            if key.startswith('"') and key.endswith('"'):
-                key_content = key[1:-1]
-            else:
-                key_content = key
-
-            # If the key does not start with an alphabet letter, prepend a random letter.
-            if key_content and not key_content[0].isalpha():
-                random_letter = random.choice(string.ascii_letters)
-                key_content = random_letter + key_content
-
-            # Escape double quotes and backslashes in the key.
-            escaped_key = ""
-            for char in key_content:
-                if char in ('"', '\\', '\n', '\r', "(", ")"):
-                    escaped_key += ''
-                else:
-                    escaped_key += char
-            normalized_key = f'"{escaped_key}"'
-
-            # Normalize the value recursively.
-            normalized_value = normalize_generated_value(val)
-            normalized_pairs.append(f"{normalized_key}: {normalized_value}")
-
-        return "{" + ", ".join(normalized_pairs) + "}"
+        return (True, iter(parse_object_members(content)), [])
 
     elif inferred_type == 'number':
         # small chance to replace with counter factual number
-        if p_counter_factual < 0.01:
+        if random.random() < 0.01:
             value = rand_num()
             return value
-        
-        # handle octal
-        if len(value) > 2 and value[1] in ('o', 'O', 'b', 'B'):
-            value[1] = '9'
-            value = value[1:]
-        
-        # Remove all leading zeros from the number while preserving sign and fractional part.
-        sign = ""
-        num_str = value
-
-        if num_str.startswith("-"):
-            sign = "-"
-            num_str = num_str[1:]
-
-        if "." in num_str:
-            int_part, frac_part = num_str.split(".", 1)
-            int_part = int_part.lstrip("0")
-            if int_part == "":
-                int_part = "0"
-            return sign + int_part + "." + frac_part
-        else:
-            num_str = num_str.lstrip("0")
-            if num_str == "":
-                num_str = "0"
-            return sign + num_str
+        return _normalize_number(value)
 
     # For booleans, return the value unchanged.
     return value
+
+
+def normalize_generated_value(value: str) -> str:
+    node = _normalize_node(value)
+    if type(node) is str:
+        return node
+
+    # Walk nested containers with an explicit stack instead of recursion, visiting
+    # members in the same depth-first order so the random draws are unchanged.
+    # Each frame is (key prefix in the parent, is_object, members, normalized parts).
+    stack = [("", *node)]
+    while True:
+        prefix, is_object, members, parts = stack[-1]
+        # Resume the innermost container; break out when a member opens a new one
+        for member in members:
+            if is_object:
+                key, val = member
+                child_prefix = _normalize_key(key) + ": "
+            else:
+                child_prefix, val = "", member
+            child = _normalize_node(val)
+            if type(child) is str:
+                parts.append(child_prefix + child)
+            else:
+                stack.append((child_prefix, *child))
+                break
+        else:
+            stack.pop()
+            if is_object:
+                text = prefix + "{" + ", ".join(parts) + "}"
+            else:
+                text = prefix + "[" + ", ".join(parts) + "]"
+            if not stack:
+                return text
+            stack[-1][3].append(text)
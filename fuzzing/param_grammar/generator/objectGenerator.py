@@ -1,8 +1,15 @@
 import os
+import logging
 import random
-from typing import List
+from typing import List, Optional
 from .apiGenerator import MethodGenerator, PropertyGenerator
 
+# Load errors for malformed API folders; enable DEBUG to see them
+_log = logging.getLogger(__name__)
+
+# A permanent instance is picked this many times as often as a temporary one
+_PERMENENT_WEIGHT = 5
+
 class ObjectGenerator:
     def __init__(self, folder_path: str, config: dict):
         self.folder_path = folder_path
@@ -13,28 +20,56 @@ class ObjectGenerator:
         self.object_name = os.path.basename(os.path.normpath(folder_path))
 
         # An array to store the names of this object's instances.
+        # Each permanent instance appears _PERMENENT_WEIGHT times.
         self.instances: List[str] = []
         self.permenent_instances: List[str] = []
 
+        self._load_all_apis()
+
+    def _load_all_apis(self):
         # Prepare valid and invalid API generator lists
-        self.method_generators = {}
-        self.property_generators = {}
-        self.method_generators_invalid = {}
-        self.property_generators_invalid = {}
+        method_generators = {}
+        property_generators = {}
+        method_generators_invalid = {}
+        property_generators_invalid = {}
 
         # Load method APIs
-        methods_path = os.path.join(folder_path, "methods")
+        methods_path = os.path.join(self.folder_path, "methods")
         if os.path.isdir(methods_path):
-            self._load_apis(methods_path, MethodGenerator)
+            self._load_apis(methods_path, MethodGenerator, method_generators, method_generators_invalid)
         
         # Load property APIs
-        properties_path = os.path.join(folder_path, "properties")
+        properties_path = os.path.join(self.folder_path, "properties")
         if os.path.isdir(properties_path):
-            self._load_apis(properties_path, PropertyGenerator)
-
-        self.api_list = self._get_api_list()
-
-    def _load_apis(self, api_folder_path: str, generator_cls):
+            self._load_apis(properties_path, PropertyGenerator, property_generators, property_generators_invalid)
+
+        api_list = [
+            *method_generators, *property_generators,
+            *method_generators_invalid, *property_generators_invalid,
+        ]
+        # API name -> generator for dispatch; later buckets win, as in the original lookup order
+        all_generators = {
+            **method_generators,
+            **property_generators,
+            **method_generators_invalid,
+            **property_generators_invalid,
+        }
+        # Valid APIs that take no parameters, answered by get_apis_with_no_parameters
+        apis_no_params = tuple(
+            generator.api_name
+            for generator in (*method_generators.values(), *property_generators.values())
+            if generator._has_no_parameters
+        )
+
+        self.method_generators = method_generators
+        self.property_generators = property_generators
+        self.method_generators_invalid = method_generators_invalid
+        self.property_generators_invalid = property_generators_invalid
+        self.api_list = api_list
+        self._all_generators = all_generators
+        self._apis_no_params = apis_no_params
+
+    def _load_apis(self, api_folder_path: str, generator_cls, valid: dict, invalid: dict):
         blocklist = self.config.get("blocklist", [])
         
         for item in os.listdir(api_folder_path):
@@ -44,26 +79,20 @@ class ObjectGenerator:
                     generator = generator_cls(item_path)
                     full_api_name = f"{self.object_name}.{generator.api_name}"
                     
-                    # Create target list based on blocklist status and generator type
-                    if full_api_name in blocklist:
-                        target_dict = self.method_generators_invalid if generator_cls == MethodGenerator else self.property_generators_invalid
-                    else:
-                        target_dict = self.method_generators if generator_cls == MethodGenerator else self.property_generators
+                    # Pick the target dict based on blocklist status
+                    target_dict = invalid if full_api_name in blocklist else valid
                     target_dict[generator.api_name] = generator
                     
                 except (FileNotFoundError, ValueError) as e:
-                    print(f"[X] Error in {item_path}, {e}")
-                    pass
-
-    def _get_api_list(self) -> List[str]:
-        apis = []
-        apis.extend(self.method_generators.keys())
-        apis.extend(self.property_generators.keys())
-        apis.extend(self.method_generators_invalid.keys())
-        apis.extend(self.property_generators_invalid.keys())
-        
-        # Convert to list to ensure proper return type.
-        return list(apis)
+                    _log.debug("[X] Error in %s, %s", item_path, e, exc_info=True)
+
+    def _has_instances(self) -> bool:
+        return bool(self.instances)
+
+    def _pick_instance(self) -> Optional[str]:
+        if not self.instances:
+            return None
+        return random.choice(self.instances)
 
     def add_instance(self, instance_name: str):
         if instance_name not in self.instances:
@@ -72,7 +101,11 @@ class ObjectGenerator:
     def add_permenent_instance(self, instance_name: str):
         if instance_name not in self.permenent_instances:
             self.permenent_instances.append(instance_name)
-            self.instances.extend([instance_name] * 5)
+            self.instances.extend([instance_name] * _PERMENENT_WEIGHT)
+
+    def add_permenent_instances(self, instance_names: List[str]):
+        for instance_name in instance_names:
+            self.add_permenent_instance(instance_name)
 
 
     def remove_instance(self, instance_name: str):
@@ -83,31 +116,22 @@ class ObjectGenerator:
     def clean_instance(self):
         self.instances = []
         for item in self.permenent_instances:
-            self.instances.extend([item] * 5)
+            self.instances.extend([item] * _PERMENENT_WEIGHT)
 
     
     def get_specific_api_call_statement(self, api_name: str) -> str:
-        if not self.instances:
+        # Choose a random instance
+        instance_name = self._pick_instance()
+        if instance_name is None:
             # print(f"// No instances available for object {self.object_name}.")
             return None 
 
-        # Choose a random instance
-        instance_name = random.choice(self.instances)
-
-        api_call_str = None
-        # Check in valid method generators
-        if api_name in self.method_generators:
-            api_call_str = self.method_generators[api_name].generate_api_call_statement()
-        # Check in valid property generators
-        if api_name in self.property_generators:
-            api_call_str = self.property_generators[api_name].generate_api_call_statement()
-        # Check in invalid method generators
-        if api_name in self.method_generators_invalid:
-            api_call_str = self.method_generators_invalid[api_name].generate_api_call_statement()
-        # Check in invalid property generators
-        if api_name in self.property_generators_invalid:
-            api_call_str = self.property_generators_invalid[api_name].generate_api_call_statement()
-        
+        # Look up the generator across valid and invalid methods/properties
+        generator = self._all_generators.get(api_name)
+        if generator is None:
+            return None
+        api_call_str = generator.generate_api_call_statement()
+
         if not api_call_str:
             return None
         
@@ -117,27 +141,18 @@ class ObjectGenerator:
     
     
     def get_specific_api_call_raw(self, api_name: str) -> str:
-        if not self.instances:
+        # Choose a random instance
+        instance_name = self._pick_instance()
+        if instance_name is None:
             # print(f"// No instances available for object {self.object_name}.")
             return None 
 
-        # Choose a random instance
-        instance_name = random.choice(self.instances)
-
-        api_call_dict = None
-        # Check in valid method generators
-        if api_name in self.method_generators:
-            api_call_dict = self.method_generators[api_name].generate_api_call_raw()
-        # Check in valid property generators
-        if api_name in self.property_generators:
-            api_call_dict = self.property_generators[api_name].generate_api_call_raw()
-        # Check in invalid method generators
-        if api_name in self.method_generators_invalid:
-            api_call_dict = self.method_generators_invalid[api_name].generate_api_call_raw()
-        # Check in invalid property generators
-        if api_name in self.property_generators_invalid:
-            api_call_dict = self.property_generators_invalid[api_name].generate_api_call_raw()
-        
+        # Look up the generator across valid and invalid methods/properties
+        generator = self._all_generators.get(api_name)
+        if generator is None:
+            return None
+        api_call_dict = generator.generate_api_call_raw()
+
         if not api_call_dict:
             return None
         
@@ -172,13 +187,17 @@ class ObjectGenerator:
         all_generators = list(self.method_generators.values()) + list(self.property_generators.values())
         call_statements = []
 
-        if not self.instances:
+        if not self._has_instances():
             for _ in all_generators:
                 call_statements.append("// No instances available for this object.")
             return call_statements
 
+        # The pool cannot change during the batch, so bind it once and index into it
+        pool = self.instances
+        n = len(pool)
+        rand = random.random
         for generator in all_generators:
-            instance_name = random.choice(self.instances)
+            instance_name = pool[int(rand() * n)]
             api_call = generator.generate_api_call_statement()
             call_statement = f"try{{{instance_name}.{api_call}}} catch(e){{}}"
             call_statements.append(call_statement)
@@ -189,19 +208,22 @@ class ObjectGenerator:
         all_generators = list(self.method_generators.values()) + list(self.property_generators.values()) + list(self.method_generators_invalid.values()) + list(self.property_generators_invalid.values())
         call_statements = []
 
-        if not self.instances:
+        if not self._has_instances():
             for _ in all_generators:
                 call_statements.append("// No instances available for this object.")
             return call_statements
 
+        # The pool cannot change during the batch, so bind it once and sample from it
+        pool = self.instances
         for generator in all_generators:
             current_statements = []
+            append = current_statements.append
+            generate = generator.generate_api_call_statement
             try:
-                for _ in range(30):
-                    instance_name = random.choice(self.instances)
-                    api_call = generator.generate_api_call_statement()
-                    call_statement = f"try{{{instance_name}.{api_call}}} catch(e){{}}"
-                    current_statements.append(call_statement)
+                # Draw all 30 instances up front in one call
+                for instance_name in random.choices(pool, k=30):
+                    # A single f-string compiles to one BUILD_STRING, cheaper than chained +
+                    append(f"try{{{instance_name}.{generate()}}} catch(e){{}}")
             except Exception as e:
                 print(f"Error in generating API {generator.api_name}, {e}")
             call_statements.append("\n".join(current_statements))
@@ -209,16 +231,5 @@ class ObjectGenerator:
         return call_statements
     
     def get_apis_with_no_parameters(self) -> List[str]:
-        apis_no_params = []
-        
-        # Check all method generators
-        for generator in self.method_generators:
-            if generator._has_no_parameters:
-                apis_no_params.append(generator.api_name)
-        
-        # Check all property generators
-        for generator in self.property_generators:
-            if generator._has_no_parameters:
-                apis_no_params.append(generator.api_name)
-        
-        return apis_no_params
\ No newline at end of file
+        # Valid method and property APIs, collected once when the generators are loaded
+        return list(self._apis_no_params)
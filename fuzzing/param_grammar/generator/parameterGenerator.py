@@ -1,8 +1,12 @@
 import os
+import logging
 import json
 import random
 import re
 
+# Load errors for malformed grammar files; enable DEBUG to see them
+_log = logging.getLogger(__name__)
+
 class ParameterGenerator:
     PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]+)\}")
 
@@ -15,70 +19,144 @@ class ParameterGenerator:
         """
         self.folder_path = folder_path
         self.grammar = {}
+        # Per symbol, each expansion pre-split into alternating literal text and
+        # placeholder symbols: (lit0, sym0, lit1, sym1, ..., litN)
+        self._compiled = {}
+        # Per symbol, the expansions to use once max_depth is reached
+        self._compiled_non_recursive = {}
+        # Symbols whose expansions contain no placeholders -> their literal strings
+        self._terminal_choices = {}
 
         # New: Keep track of the default start symbol based on the first
         # non-terminal we encounter in the first JSON grammar file.
         self._default_start_symbol = None
 
-        self._build_grammar()
-
-    def _build_grammar(self):
-        for filename in os.listdir(self.folder_path):
-            full_path = os.path.join(self.folder_path, filename)
-            # We only parse files with a .json extension
-            if os.path.isfile(full_path) and filename.lower().endswith(".json"):
-                self._parse_grammar_file(full_path)
-
-    def _parse_grammar_file(self, json_file_path: str):
+        self._build_grammar(self._scan_grammar_files())
 
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except Exception as e:
-                print(f"[X] Error in {f}, {e}")
+    def _scan_grammar_files(self):
+        # One directory scan; DirEntry.is_file() reuses the scan's file info where the OS provides it
+        with os.scandir(self.folder_path) as it:
+            return tuple(
+                entry.path
+                for entry in it
+                # We only parse files with a .json extension
+                if entry.name.lower().endswith(".json") and entry.is_file()
+            )
 
-            for rule in data:
-                if not isinstance(rule, list) or len(rule) != 2:
-                    continue  # Skip invalid rules silently
+    def _build_grammar(self, grammar_files):
+        for full_path in grammar_files:
+            self._parse_grammar_file(full_path)
+        self._compile_grammar()
 
-                non_terminal, expansion = rule
-
-                # If we haven't set the default start symbol yet, set it now
-                if self._default_start_symbol is None:
-                    self._default_start_symbol = non_terminal
-
-                if non_terminal not in self.grammar:
-                    self.grammar[non_terminal] = []
-                self.grammar[non_terminal].append(expansion)
+    def _parse_grammar_file(self, json_file_path: str):
 
-    def _expand_symbol(self, symbol: str, depth: int = 0, max_depth: int = 10) -> str:
+        with open(json_file_path, "rb") as f:
+            raw = f.read()
+        try:
+            # json.loads detects the UTF-8 encoding of bytes itself
+            data = json.loads(raw)
+        except Exception as e:
+            _log.debug("[X] Error in %s, %s", json_file_path, e, exc_info=True)
+            return
+
+        grammar = self.grammar
+        for rule in data:
+            if not isinstance(rule, list) or len(rule) != 2:
+                continue  # Skip invalid rules silently
+
+            non_terminal, expansion = rule
+
+            # If we haven't set the default start symbol yet, set it now
+            if self._default_start_symbol is None:
+                self._default_start_symbol = non_terminal
+
+            expansions = grammar.get(non_terminal)
+            if expansions is None:
+                grammar[non_terminal] = [expansion]
+            else:
+                expansions.append(expansion)
+
+    @staticmethod
+    def _restore_braces(text: str) -> str:
+        return text.replace("<<<LEFT_BRACE>>>", "{").replace("<<<RIGHT_BRACE>>>", "}")
+
+    def _compile_expansion(self, expansion: str) -> tuple:
+        # split() with one group alternates literal text and placeholder names
+        pieces = self.PLACEHOLDER_PATTERN.split(expansion)
+        tokens = [self._restore_braces(pieces[0])]
+        for i in range(1, len(pieces), 2):
+            symbol = pieces[i]
+            if symbol in self.grammar:
+                tokens.append(symbol)
+                tokens.append(self._restore_braces(pieces[i + 1]))
+            else:
+                # Unknown symbols expand to their own name, so fold them into the literal
+                tokens[-1] += self._restore_braces(symbol) + self._restore_braces(pieces[i + 1])
+        return tuple(tokens)
+
+    def _compile_grammar(self):
+        """Pre-split every expansion once the full grammar is known."""
+        for symbol, expansions in self.grammar.items():
+            compiled = [self._compile_expansion(exp) for exp in expansions]
+            self._compiled[symbol] = compiled
+            non_recursive = [tokens for exp, tokens in zip(expansions, compiled) if f"{{{symbol}}}" not in exp]
+            self._compiled_non_recursive[symbol] = non_recursive if non_recursive else compiled
+            if all(len(tokens) == 1 for tokens in compiled):
+                self._terminal_choices[symbol] = tuple(tokens[0] for tokens in compiled)
+
+    def _pick_expansion(self, symbol: str, depth: int, max_depth: int):
+        """
+        Pick one expansion of symbol: a finished string, or a list of parts whose
+        odd slots are placeholder symbols still to be expanded.
+        """
+        # Leaf productions need no depth check, just one pick
+        terminal = self._terminal_choices.get(symbol)
+        if terminal is not None:
+            return random.choice(terminal)
 
         # If the symbol is not in the grammar dictionary, return it as a literal
-        if symbol not in self.grammar:
+        if symbol not in self._compiled:
             return symbol
 
-        # If recursion depth exceeds max_depth, filter expansions that avoid further recursion
-        possible_expansions = self.grammar[symbol]
+        # If recursion depth exceeds max_depth, use the expansions that avoid further recursion
         if depth >= max_depth:
-            non_recursive = [exp for exp in possible_expansions if f"{{{symbol}}}" not in exp]
-            if non_recursive:
-                possible_expansions = non_recursive
+            possible_expansions = self._compiled_non_recursive[symbol]
+        else:
+            possible_expansions = self._compiled[symbol]
 
         # Randomly pick an expansion
-        expansion = random.choice(possible_expansions)
+        tokens = random.choice(possible_expansions)
+        if len(tokens) == 1:
+            return tokens[0]
+        return list(tokens)
 
-        # Find placeholders of the form {SOMETHING}
-        placeholders = self.PLACEHOLDER_PATTERN.findall(expansion)
-
-        # For each placeholder, recursively expand it and replace in the result
-        result = expansion
-        for ph in placeholders:
-            expanded_ph = self._expand_symbol(ph, depth + 1, max_depth)
-            result = result.replace(f"{{{ph}}}", expanded_ph, 1)
-
-        # Restore literal braces
-        result = result.replace("<<<LEFT_BRACE>>>", "{").replace("<<<RIGHT_BRACE>>>", "}")
-        return result
+    def _expand_symbol(self, symbol: str, depth: int = 0, max_depth: int = 10) -> str:
+        parts = self._pick_expansion(symbol, depth, max_depth)
+        if type(parts) is str:
+            return parts
+
+        # Fill placeholder slots depth-first with an explicit stack instead of recursion,
+        # in the same order so the random picks are unchanged.
+        # Each frame is (parts, remaining placeholder slots, depth, slot in the parent).
+        pick = self._pick_expansion
+        stack = [(parts, iter(range(1, len(parts), 2)), depth, 0)]
+        while True:
+            parts, slots, frame_depth, parent_slot = stack[-1]
+            # Resume the innermost expansion; break out when a slot needs its own frame
+            for slot in slots:
+                child = pick(parts[slot], frame_depth + 1, max_depth)
+                if type(child) is str:
+                    parts[slot] = child
+                else:
+                    stack.append((child, iter(range(1, len(child), 2)), frame_depth + 1, slot))
+                    break
+            else:
+                # All slots filled: join and hand the text to the parent's slot
+                stack.pop()
+                text = "".join(parts)
+                if not stack:
+                    return text
+                stack[-1][0][parent_slot] = text
 
     def generate_parameter(self, start_symbol: str = None) -> str:
         # If no start_symbol is provided or it's invalid, use the default start symbol
@@ -1,10 +1,16 @@
 import re
+import functools
+import operator
 from z3 import (
     Solver, Const, Real, Bool, SetSort, IntSort,
     String, StringVal, Implies, IsMember,
-    Not, EmptySet, sat, And, Or, BoolVal
+    Not, EmptySet, sat, And, Or, BoolVal,
+    SetAdd, IntVal
 )
 
+_SEXP_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+
+
 def parse_sexp(s):
 
     s = s.strip()
@@ -12,49 +18,58 @@ def parse_sexp(s):
     if not s.startswith('('):
         return s
     
-    # Remove outer parentheses
-    # e.g., "(and (>= x 0) (< x y))" -> "and (>= x 0) (< x y)"
-    assert s[0] == '(' and s[-1] == ')', f"Expression does not have matching parentheses: {s}"
-    inner = s[1:-1].strip()
-    
-    tokens = []
-    bracket_level = 0
-    current_token = []
-    
-    for char in inner:
-        if char == '(':
-            bracket_level += 1
-            current_token.append(char)
-        elif char == ')':
-            bracket_level -= 1
-            current_token.append(char)
-        elif char.isspace() and bracket_level == 0:
-            # Token delimiter
-            if current_token:
-                tokens.append("".join(current_token))
-                current_token = []
+    # Single pass over the tokens, building nested lists on an explicit stack.
+    # e.g., "(and (>= x 0) (< x y))" -> ['and', ['>=', 'x', '0'], ['<', 'x', 'y']]
+    # Each frame is [offset of its '(', children, raw text of a parenthesized operator]
+    stack = []
+    for m in _SEXP_TOKEN.finditer(s):
+        token = m.group()
+        if token == '(':
+            stack.append([m.start(), [], None])
+        elif token == ')':
+            start, children, raw_operator = stack.pop()
+            # A parenthesized single token is the token itself, e.g. "((i Int))" -> ['i', 'Int']
+            if len(children) == 1:
+                node = children[0]
+            else:
+                # The operator is kept as written, even when it is parenthesized
+                if raw_operator is not None:
+                    children[0] = raw_operator
+                node = children
+            if not stack:
+                # s is stripped, so anything left is a second top-level expression
+                if m.end() != len(s):
+                    raise ValueError(f"Unexpected text after expression: {s}")
+                return node
+            parent = stack[-1]
+            if not parent[1]:
+                parent[2] = s[start:m.end()]
+            parent[1].append(node)
         else:
-            current_token.append(char)
-    # Append last token if any
-    if current_token:
-        tokens.append("".join(current_token))
-    
-    # Now tokens[0] should be the operator, the rest are sub-expressions
-    # For example, tokens = ["and", "(>= x 0)", "(< x y)"]
-    operator = tokens[0]
-    if len(tokens) == 1:
-        # A single token could itself be an S-expression if it has parentheses
-        return parse_sexp(operator)
-    
-    # Parse each subtoken (except the first which is operator)
-    sub_exprs = []
-    for t in tokens[1:]:
-        sub_exprs.append(parse_sexp(t))
-    
-    return [operator] + sub_exprs
+            stack[-1][1].append(token)
 
+    raise AssertionError(f"Expression does not have matching parentheses: {s}")
 
-def build_z3_constraints(expr, var_map, solver, constraint_type):
+
+# Two-operand operators for build_z3_constraints
+_BINARY_OPS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    # Use <= to represent subset: left <= right means left is a subset of right
+    'subset': operator.le,
+    # handle Implication
+    '=>': Implies,
+    # handle Membership: the left operand is a member of the right set
+    'contains': IsMember,
+}
+
+
+def build_z3_constraints(expr, var_map, constraint_type):
+    # Pure translation: returns one z3 expression (or None), the caller adds it to the solver
 
     # If expr is a string (e.g. 'x', 'true', '5'), we treat it as a leaf node (variable or constant)
     if isinstance(expr, str):
@@ -67,31 +82,21 @@ def build_z3_constraints(expr, var_map, solver, constraint_type):
     # Handle top-level "assert" by just stripping it and building from the inside
     if op == 'assert':
         # There's exactly 1 sub-expression inside (assert ... )
-        return build_z3_constraints(expr[1], var_map, solver, constraint_type)
+        return build_z3_constraints(expr[1], var_map, constraint_type)
     
-    if op == 'and':
-        # Combine all sub constraints with logical And
+    if op == 'and' or op == 'or':
+        # Combine all sub constraints with logical And / Or, so a conjunction nested
+        # inside a disjunction stays inside it
         sub_constraints = []
         for sub in expr[1:]:
-            c = build_z3_constraints(sub, var_map, solver, constraint_type)
+            c = build_z3_constraints(sub, var_map, constraint_type)
             if c is not None:
                 sub_constraints.append(c)
-        if sub_constraints:
-            conj = And(*sub_constraints)
-            solver.add(conj)
-        return None
-    
-    if op == 'or':  # <--- NEW OR HANDLER
-        # Combine all sub constraints with logical Or
-        sub_constraints = []
-        for sub in expr[1:]:
-            c = build_z3_constraints(sub, var_map, solver, constraint_type)
-            if c is not None:
-                sub_constraints.append(c)
-        if sub_constraints:
-            disj = Or(*sub_constraints)
-            solver.add(disj)
-        return None
+        if not sub_constraints:
+            return None
+        if op == 'and':
+            return And(*sub_constraints)
+        return Or(*sub_constraints)
     
     if op == 'not':
         # There's exactly 1 sub-expression (not x)
@@ -102,7 +107,7 @@ def build_z3_constraints(expr, var_map, solver, constraint_type):
             return Not(var_map[sub_expr])
         else:
             # sub_expr is something else, e.g. (>= x 0)
-            sc = build_z3_constraints(sub_expr, var_map, solver, constraint_type)
+            sc = build_z3_constraints(sub_expr, var_map, constraint_type)
             if sc is not None:
                 return Not(sc)
         return None
@@ -116,7 +121,7 @@ def build_z3_constraints(expr, var_map, solver, constraint_type):
         # If left or right is itself a list (like (not x)), we recursively build that first
         z3_left = None
         if isinstance(left, list):
-            z3_left = build_z3_constraints(left, var_map, solver, constraint_type)
+            z3_left = build_z3_constraints(left, var_map, constraint_type)
         else:
             # It's a variable or constant
             if left in var_map:
@@ -127,38 +132,17 @@ def build_z3_constraints(expr, var_map, solver, constraint_type):
         
         z3_right = None
         if isinstance(right, list):
-            z3_right = build_z3_constraints(right, var_map, solver, constraint_type)
+            z3_right = build_z3_constraints(right, var_map, constraint_type)
         else:
             if right in var_map:
                 z3_right = var_map[right]
             else:
                 z3_right = parse_constant(right, constraint_type)
         
-        if op == '=':
-            return z3_left == z3_right
-        elif op == '!=':
-            return z3_left != z3_right
-        elif op == '>':
-            return z3_left > z3_right
-        elif op == '>=':
-            return z3_left >= z3_right
-        elif op == '<':
-            return z3_left < z3_right
-        elif op == '<=':
-            return z3_left <= z3_right
-        elif op == 'subset':
-            # Use <= to represent subset
-            # z3_left <= z3_right means: left is subset of right
-            return z3_left <= z3_right
-        elif op == '=>':
-            # handle Implication
-            return Implies(z3_left, z3_right)
-        elif op == 'contains':
-            # handle Membership
-            # Check if the left operand is a member of the right set
-            return IsMember(z3_left, z3_right)
-        else:
+        binop = _BINARY_OPS.get(op)
+        if binop is None:
             raise ValueError(f"Unknown operator '{op}'in {expr}.")
+        return binop(z3_left, z3_right)
     else:
         raise ValueError(f"Unhandled expression structure: {expr}")
 
@@ -197,9 +181,8 @@ def solve_for_other_symbol(constraint_dict, known_symbol, known_value):
     
     constraint_type = constraint_dict.get("type", "").lower().strip()
     
-    parsed_expr = parse_sexp(constraint_str)
-    var_names = set()
-    collect_variables(parsed_expr, var_names)
+    parsed_expr, constraint_vars, subset_expressions = _parse_and_collect(constraint_str)
+    var_names = set(constraint_vars)
     
     if known_symbol not in var_names:
         # It's possible the expression references it in a sub form, but let's just check
@@ -249,32 +232,29 @@ def solve_for_other_symbol(constraint_dict, known_symbol, known_value):
             # Try to parse it as well
             raise ValueError("For 'array' type, known_value must be a Python set of ints.")
         s_expr = EmptySet(IntSort())
+        # Add one element per step, so the term grows linearly with the set
         for elt in known_value:
-            s_expr = s_expr.union(s_expr, s_expr.add(elt))
+            s_expr = SetAdd(s_expr, IntVal(elt))
         solver.add(var_map[known_symbol] == s_expr)
     else:
         # String case
         from z3 import StringVal
         solver.add(var_map[known_symbol] == StringVal(str(known_value)))
 
-    z3_constraint = build_z3_constraints(parsed_expr, var_map, solver, constraint_type)
+    z3_constraint = build_z3_constraints(parsed_expr, var_map, constraint_type)
     if z3_constraint is not None:
         solver.add(z3_constraint)
     
     if constraint_type == 'array':
 
-        if '(subset ' in constraint_str.lower():
-
-            subset_expressions = find_subset_expressions(parsed_expr)
-            for sub_expr in subset_expressions:
-                # sub_expr -> ['subset', 'y', 'x']
-                if len(sub_expr) == 3:
-                    left_side = sub_expr[1]
-                    # If left_side is the unknown symbol and different from the known symbol, enforce non-empty
-                    # Or if the known symbol is not 'y', meaning 'y' is unknown. 
-                    if (isinstance(left_side, str) and left_side != known_symbol):
-                        # left_side is the symbol we are solving for -> enforce var_map[left_side] != empty
-                        solver.add(var_map[left_side] != EmptySet(IntSort()))
+        for sub_expr in subset_expressions:
+            # sub_expr -> ['subset', 'y', 'x']
+            left_side = sub_expr[1]
+            # If left_side is the unknown symbol and different from the known symbol, enforce non-empty
+            # Or if the known symbol is not 'y', meaning 'y' is unknown. 
+            if (isinstance(left_side, str) and left_side != known_symbol):
+                # left_side is the symbol we are solving for -> enforce var_map[left_side] != empty
+                solver.add(var_map[left_side] != EmptySet(IntSort()))
     
 
     result = solver.check()
@@ -296,7 +276,18 @@ def solve_for_other_symbol(constraint_dict, known_symbol, known_value):
         return solution_dict
 
 
-def collect_variables(expr, var_set):
+@functools.lru_cache(maxsize=1024)
+def _parse_and_collect(constraint_str):
+    # The same relation constraints are solved over and over, so parse each string once.
+    # Callers must treat the parsed tree as read-only.
+    parsed_expr = parse_sexp(constraint_str)
+    var_names = set()
+    subset_expressions = []
+    collect_variables(parsed_expr, var_names, subset_expressions)
+    return parsed_expr, frozenset(var_names), tuple(subset_expressions)
+
+
+def collect_variables(expr, var_set, subset_out=None):
 
     if isinstance(expr, str):
         # Check if it's an operator or a boolean constant
@@ -305,22 +296,11 @@ def collect_variables(expr, var_set):
                         'true', 'false'):
             var_set.add(expr)
     else:
-        # It's a list
+        # It's a list; (subset A B) sub-expressions are gathered in the same walk
+        if subset_out is not None and len(expr) == 3 and expr[0] == 'subset':
+            subset_out.append(expr)
         for sub in expr:
-            collect_variables(sub, var_set)
-
-
-def find_subset_expressions(expr):
-
-    results = []
-    if isinstance(expr, list):
-        if len(expr) == 3 and expr[0] == 'subset':
-            results.append(expr)
-        else:
-            for sub in expr:
-                if isinstance(sub, list):
-                    results.extend(find_subset_expressions(sub))
-    return results
+            collect_variables(sub, var_set, subset_out)
 
 
 def get_python_value(z3_val, constraint_type):
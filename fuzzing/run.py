@@ -1,23 +1,74 @@
 import argparse
+import functools
 import json
 import os
 import mPDF
 import monitor
 import random
+from concurrent.futures import ProcessPoolExecutor
 from param_grammar.generator import CodeGenerator, CodeGenerator_basic
 
 TESTDIR = 'test'
 TNUM = 30000  # Number of test files to generate
 SNUM = 2048  # Number of API calls per test file
+GEN_BATCH = 256  # Test files generated in parallel before they are executed
 
 def getname(elem):
     """Extract numerical prefix from filename for sorting."""
     try:
-        return int(elem.split(".")[0])
+        return int(elem.partition(".")[0])
     except ValueError as e:
         print(f"Error parsing filename: {e}")
         return 0
 
+def _read_api_list(path):
+    """Read a non-empty-line API list, or [] if the file does not exist."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+@functools.lru_cache(maxsize=None)
+def _load_config(weak_relation, symbolic_relation):
+    """Load the generator config once per process; the generators only read it."""
+    # Load blocklist and limitlist configuration
+    config = {
+        'blocklist': _read_api_list(os.path.join('config', 'blocklist.txt')),
+        'limitlist': _read_api_list(os.path.join('config', 'limitlist.txt')),
+    }
+
+    if weak_relation:
+        weak_relation_path = os.path.join('config', 'all_relation.json')
+        with open(weak_relation_path, 'r') as f:
+            config['weak_relations'] = json.load(f)
+
+    if symbolic_relation:
+        symbolic_relation_path = os.path.join('config', 'all_symbolic.json')
+        with open(symbolic_relation_path, 'r') as f:
+            config['symbolic_relations'] = json.load(f)
+
+    return config
+
+# Fuzzer owned by a generation worker process
+_worker_fuzzer = None
+
+def _init_worker(fuzzer_cls, init_args):
+    """Build the per-process fuzzer used to generate test cases."""
+    global _worker_fuzzer
+    # Forked workers inherit the parent's RNG state, so reseed each one
+    random.seed()
+    _worker_fuzzer = fuzzer_cls(*init_args)
+
+def _generate_one(ind):
+    """Generate test case `ind` in a worker and return its filename, or None on error."""
+    _worker_fuzzer.ind = ind
+    try:
+        _worker_fuzzer.new_test()
+    except Exception as e:
+        print(f"Error generating test case {ind}: {e}")
+        return None
+    return _worker_fuzzer.curfname
+
 class JSFuzz:
     def __init__(self, target, dry_run=False, weak_relation=False, symbolic_relation=False):
         # Create test directory if not exists
@@ -29,6 +80,7 @@ class JSFuzz:
         self.weak_relation = weak_relation
         self.symbolic_relation = symbolic_relation
         self.target = target # fuzzing target
+        self.init_args = None # constructor args for generation workers, None to generate in-process
   
     def _choose_target_monitor(self, file_name):
         if self.target == "adobe":
@@ -53,6 +105,10 @@ class JSFuzz:
 
     def startup(self):
         """Generate all test cases and optionally execute them."""
+        if self.init_args is not None:
+            self._startup_parallel()
+            return
+
         for _ in range(TNUM):
             try:
                 self.new_test()
@@ -64,13 +120,40 @@ class JSFuzz:
             except Exception as e:
                 print(f"Error running test case: {e}")
 
+    def _startup_parallel(self):
+        """Generate test cases in worker processes batch by batch, then execute each batch here."""
+        # Leave one core for this process
+        workers = max(1, (os.cpu_count() or 1) - 1)
+        end = self.ind + TNUM
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(type(self), self.init_args)) as executor:
+            while self.ind < end:
+                batch = range(self.ind, min(self.ind + GEN_BATCH, end))
+                # list() waits for the whole batch, so the pool is idle while tests run:
+                # the monitors treat system-wide CPU load as a sign the target is still busy
+                fnames = list(executor.map(_generate_one, batch, chunksize=max(1, len(batch) // workers)))
+                self.ind = batch.stop
+
+                for fname in fnames:
+                    if fname is None:
+                        continue
+                    self.curfname = fname
+                    print(f"Generating: {self.curfname}")
+
+                    # Target monitors drive a GUI app, so test cases still run one at a time
+                    if not self.dry_run:
+                        try:
+                            self.run_testcase()
+                        except Exception as e:
+                            print(f"Error running test case: {e}")
+
     def runPDF(self):
         """Process all generated PDF test files."""
         if self.dry_run:
             return  # Skip processing in dry-run mode
         
-        file_list = os.listdir(TESTDIR)
-        file_list.sort(key=getname)
+        with os.scandir(TESTDIR) as it:
+            file_list = sorted((entry.name for entry in it), key=getname)
         for fname in file_list:
             monitor_instance = self._choose_target_monitor(fname)
             monitor_instance.startUp()
@@ -81,61 +164,35 @@ class Param_JSFuzz(JSFuzz):
     """Parameter-focused fuzzing implementation."""
     def __init__(self, base_directory, target, dry_run=False, weak_relation=False, symbolic_relation=False):
         super().__init__(target, dry_run, weak_relation, symbolic_relation)  # Initialize parent class
-        # Load blocklist configuration
-        blocklist_path = os.path.join('config', 'blocklist.txt')
-        blocklist_apis = []
-        
-        if os.path.exists(blocklist_path):
-            with open(blocklist_path, 'r') as bl_file:
-                blocklist_apis = [line.strip() for line in bl_file if line.strip()]
-        
-        config = {'blocklist': blocklist_apis}
+        self.init_args = (base_directory, target, True, weak_relation, symbolic_relation)
+        self.base_directory = base_directory
+        # Built on first use, so only the processes that generate test cases pay for them
+        self.code_generator = None
+        self.code_generator_basic = None
 
-        # Load limitlist configuration
-        limitlist_path = os.path.join('config', 'limitlist.txt')
-        limitlist_apis = []
-        
-        if os.path.exists(limitlist_path):
-            with open(limitlist_path, 'r') as bl_file:
-                limitlist_apis = [line.strip() for line in bl_file if line.strip()]
-        
-        config['limitlist'] = limitlist_apis
-
-        if weak_relation:
-            weak_relation_path = os.path.join('config', 'all_relation.json')
-            with open(weak_relation_path, 'r') as f:
-                weak_relations = json.load(f)
-            config['weak_relations'] = weak_relations
+    def _build_generators(self):
+        """Build the code generators from the shared config."""
+        # Config files are parsed once per process and shared by every fuzzer
+        config = _load_config(self.weak_relation, self.symbolic_relation)
 
-        if symbolic_relation:
-            symbolic_relation_path = os.path.join('config', 'all_symbolic.json')
-            with open(symbolic_relation_path, 'r') as f:
-                symbolic_relations = json.load(f)
-            config['symbolic_relations'] = symbolic_relations
-
-        self.code_generator = CodeGenerator(base_directory, config)
-        self.code_generator_basic = CodeGenerator_basic(base_directory, config)
+        self.code_generator = CodeGenerator(self.base_directory, config)
+        self.code_generator_basic = CodeGenerator_basic(self.base_directory, config)
 
     def new_test(self):
         """Generate new parameter test case."""
-        if random.random() < 0.8:
-            statements = self.code_generator.generate_api_statements_with_relation(SNUM, self.weak_relation, self.symbolic_relation)
-            test_content = 'try{spell.available}catch(e){};\n' 
-            test_content += '\n'.join(statements)
-            test_content += '\ncloseDoc(1);\n'
-            
-            self.curfname = f'{self.ind}.pdf'
-            output_path = os.path.join(TESTDIR, self.curfname)
-            mPDF.make_pdf(test_content, output_path)
-        else:
-            statements = self.code_generator_basic.generate_api_statements_with_relation(SNUM, self.weak_relation, self.symbolic_relation)
-            test_content = 'try{spell.available}catch(e){};\n' 
-            test_content += '\n'.join(statements)
-            test_content += '\ncloseDoc(1);\n'
-            
-            self.curfname = f'{self.ind}.pdf'
-            output_path = os.path.join(TESTDIR, self.curfname)
-            mPDF.make_pdf(test_content, output_path)
+        if self.code_generator is None:
+            self._build_generators()
+        generator = self.code_generator if random.random() < 0.8 else self.code_generator_basic
+        statements = generator.generate_api_statements_with_relation(SNUM, self.weak_relation, self.symbolic_relation)
+        # Build the script body with a single join
+        parts = ['try{spell.available}catch(e){};']
+        parts.extend(statements)
+        parts.append('closeDoc(1);\n')
+        test_content = '\n'.join(parts)
+
+        self.curfname = f'{self.ind}.pdf'
+        output_path = os.path.join(TESTDIR, self.curfname)
+        mPDF.make_pdf(test_content, output_path)
         self.ind += 1
 
 
@@ -1,7 +1,7 @@
 import os
 import requests
 from bs4 import BeautifulSoup
-from lxml import html
+from lxml import etree, html
 from urllib.parse import urljoin
 import hashlib
 import argparse
@@ -9,12 +9,28 @@ import argparse
 
 # Global variable to store the base URL
 BASE_URL = None
-MODE = None
 
 OUTPUT_DIR = 'output'
 
+# JavaScript API section of the navigation tree for each mode
+API_SECTION_XPATH = {
+    'A': etree.XPath('/html/body/div/nav/div/div[3]/ul/li[3]'), # For Other API
+    'D': etree.XPath('/html/body/div/nav/div/div[3]/ul/li[4]'), # For Doc API
+}
+
+# First internal reference link under an element
+REF_LINK_PATH = './/a[@class="reference internal"]'
+
+
+def fetch_page(url, refresh=False):
+    # Generate a unique filename for the URL using an MD5 hash
+    filename = os.path.join("result", hashlib.md5(url.encode('utf-8')).hexdigest() + ".html")
+
+    # Reuse the saved copy unless a fresh fetch is requested
+    if not refresh and os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as file:
+            return file.read()
 
-def fetch_page(url):
     response = requests.get(url)
     response.raise_for_status()
     content = response.text
@@ -23,9 +39,6 @@ def fetch_page(url):
     if not os.path.exists("result"):
         os.makedirs("result")
 
-    # Generate a unique filename for the URL using an MD5 hash
-    filename = os.path.join("result", hashlib.md5(url.encode('utf-8')).hexdigest() + ".html")
-
     # Save the fetched content to the file
     with open(filename, "w", encoding="utf-8") as file:
         file.write(content)
@@ -33,17 +46,15 @@ def fetch_page(url):
     return content
 
 
-def parse_main_page(html_content):
+def parse_main_page(html_content, mode):
     """Parse the main page and extract JavaScript API hierarchy."""
-    tree = html.fromstring(html_content)
-    global MODE
-    if MODE == 'A':
-        js_api_section = tree.xpath('/html/body/div/nav/div/div[3]/ul/li[3]') # For Other API
-    elif MODE == 'D':
-        js_api_section = tree.xpath('/html/body/div/nav/div/div[3]/ul/li[4]') # For Doc API
-    else:
+    section_xpath = API_SECTION_XPATH.get(mode)
+    if section_xpath is None:
         # This branch should not be reached due to argparse choices.
         raise ValueError("Invalid mode parameter provided.")
+
+    tree = html.fromstring(html_content)
+    js_api_section = section_xpath(tree)
     
     if not js_api_section:
         print("JavaScript API section not found!")
@@ -56,24 +67,25 @@ def parse_main_page(html_content):
     current_object = None
     current_section = None
     
-    # First pass: build a map of which sections have children
+    # Single pass: each li's link is looked up once and reused when it is a parent
     sections_with_children = set()
+    item_links = {}
     for item in js_api_section.findall('.//li'):
+        link = item.find(REF_LINK_PATH)
+        item_links[item] = link
+
         parent_li = item.getparent().getparent()  # ul -> li
         if parent_li is not None:
-            parent_link = parent_li.find('.//a[@class="reference internal"]')
+            parent_link = item_links[parent_li] if parent_li in item_links else parent_li.find(REF_LINK_PATH)
             if parent_link is not None:
                 sections_with_children.add(parent_link.get('href', ''))
-    
-    # Second pass: process all items
-    for item in js_api_section.findall('.//li'):
+
         classes = item.get('class', '').split()
         level_class = next((c for c in classes if c.startswith('toctree-l')), None)
         if not level_class:
             continue
             
         level = int(level_class[-1])
-        link = item.find('.//a[@class="reference internal"]')
         if link is None:
             continue
             
@@ -95,8 +107,11 @@ def parse_main_page(html_content):
             'link': href,
             'object': current_object,
             'section': current_section,
-            'has_children': href in sections_with_children
         })
+
+    # Children follow their parent, so has_children is only known after the pass
+    for entry in hierarchy:
+        entry['has_children'] = entry['link'] in sections_with_children
     
     return hierarchy
 
@@ -107,30 +122,32 @@ def clean_text(text):
 def process_table(table):
     """Process any table, including version info tables."""
     rows = []
-    
-    # Process headers
     headers = []
-    for th in table.find_all('th'):
-        header_text = th.get_text().strip()
-        # For version tables, remove (Key) but keep the header
-        if '(Key)' in header_text:
-            header_text = header_text.replace('(Key)', '').strip()
-        headers.append(header_text)
-    
-    if headers:
-        rows.append(' | '.join(headers))
-        rows.append('-' * len(rows[0]))
+    body_rows = []
     
-    # Process rows
+    # One walk over the rows; header and data cells are direct children of a tr
     for tr in table.find_all('tr'):
         cells = []
-        # Only process td elements to avoid duplicate headers
-        for td in tr.find_all('td'):
-            cell_text = td.get_text().strip()
-            cells.append(cell_text)
+        for cell in tr.children:
+            name = cell.name
+            if name != 'th' and name != 'td':
+                continue
+            cell_text = cell.get_text().strip()
+            if name == 'th':
+                # For version tables, remove (Key) but keep the header
+                if '(Key)' in cell_text:
+                    cell_text = cell_text.replace('(Key)', '').strip()
+                headers.append(cell_text)
+            else:
+                cells.append(cell_text)
         
         if cells:  # Only add non-empty rows
-            rows.append(' | '.join(cells))
+            body_rows.append(' | '.join(cells))
+    
+    if headers:
+        rows.append(' | '.join(headers))
+        rows.append('-' * len(rows[0]))
+    rows.extend(body_rows)
     
     return '\n'.join(rows) if rows else ""
 
@@ -153,8 +170,9 @@ def process_section_content(section):
     
     # Get version table if exists
     version_table = section.find('div', class_='table-wrapper')
-    if version_table and version_table.find('table'):
-        table_text = process_table(version_table.find('table'))
+    table = version_table.find('table') if version_table else None
+    if table:
+        table_text = process_table(table)
         if table_text:
             content.append(table_text)
     
@@ -263,13 +281,20 @@ def process_section_content(section):
     return '\n\n'.join(line for line in content if line)
 
 
-def extract_content_between_sections(soup, current_link, item):
+def build_id_index(soup):
+    """Map each id to its first tag in document order, as soup.find(id=...) would."""
+    id_index = {}
+    for tag in soup.find_all(id=True):
+        id_index.setdefault(tag['id'], tag)
+    return id_index
+
+def extract_content_between_sections(id_index, current_link, item):
     """Extract content from the specific section ID."""
     if not current_link.startswith('#'):
         return ""
     
     current_id = current_link[1:]
-    section = soup.find(id=current_id)
+    section = id_index.get(current_id)
     if not section:
         print(f"Warning: Section {current_id} not found")
         return ""
@@ -284,7 +309,11 @@ def extract_content_between_sections(soup, current_link, item):
 
 def process_hierarchy(hierarchy, main_page_html):
     """Process the hierarchy and save content."""
-    soup = BeautifulSoup(main_page_html, 'html.parser')
+    soup = BeautifulSoup(main_page_html, 'lxml')
+    # One tree walk up front instead of one soup.find per item
+    id_index = build_id_index(soup)
+    # Most items share a few object/methods/properties folders, so create each one once
+    created_dirs = set()
     
     for item in hierarchy:
         depth = item['depth']
@@ -297,7 +326,7 @@ def process_hierarchy(hierarchy, main_page_html):
         if not object_name:
             continue
             
-        content = extract_content_between_sections(soup, link, item)
+        content = extract_content_between_sections(id_index, link, item)
         
         if depth == 2:  # Object
             path = os.path.join(OUTPUT_DIR, object_name, "object.txt")
@@ -321,7 +350,10 @@ def process_hierarchy(hierarchy, main_page_html):
         else:
             continue
             
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        directory = os.path.dirname(path)
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
         with open(path, 'w', encoding='utf-8') as f:
             f.write(content)
         # print(f"Saved: {path}")
@@ -331,6 +363,7 @@ def parse_arguments():
     """
     Parse command-line arguments.
     -m: Mode selection ('A' for Other API, 'D' for Doc API)
+    --refresh: Ignore the saved copy of the main page
     """
     parser = argparse.ArgumentParser(description="Set BASE_URL based on mode parameter.")
     parser.add_argument(
@@ -339,28 +372,32 @@ def parse_arguments():
         choices=['A', 'D'], 
         help="Mode selection: 'A' for Other API, 'D' for Doc API"
     )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Fetch the main page again even if a saved copy exists in result/"
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_arguments()
     
-    global MODE
     global BASE_URL
 
-    MODE = args.m
-    if MODE == 'A':
+    mode = args.m
+    if mode == 'A':
         BASE_URL = 'https://opensource.adobe.com/dc-acrobat-sdk-docs/library/jsapiref/JS_API_AcroJS.html'
-    elif MODE == 'D':
+    elif mode == 'D':
         BASE_URL = 'https://opensource.adobe.com/dc-acrobat-sdk-docs/library/jsapiref/doc.html'
     else:
         # This branch should not be reached due to argparse choices.
         raise ValueError("Invalid mode parameter provided.")
     print("Fetching main page...")
-    main_page_html = fetch_page(BASE_URL)
+    main_page_html = fetch_page(BASE_URL, args.refresh)
     
     print("\nParsing hierarchy...")
-    hierarchy = parse_main_page(main_page_html)
+    hierarchy = parse_main_page(main_page_html, mode)
     
     if not hierarchy:
         print("No items found to process!")